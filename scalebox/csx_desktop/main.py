@@ -1,4 +1,5 @@
 import time
+from dataclasses import dataclass
 from re import search as re_search
 from shlex import quote as quote_string
 from typing import Callable, Dict, Iterator, Literal, Optional, Tuple, Union, overload
@@ -12,6 +13,9 @@ from ..sandbox_sync import Sandbox as SandboxBase
 
 MOUSE_BUTTONS = {"left": 1, "right": 3, "middle": 2}
 
+# scrot picks the encoder from the file extension
+SCREENSHOT_EXTENSIONS = {"png": "png", "jpeg": "jpg"}
+
 KEYS = {
     "alt": "Alt_L",
     "alt_left": "Alt_L",
@@ -70,6 +74,28 @@ KEYS = {
 }
 
 
+# Key combos (after map_key) that usually close the focused window
+CLOSE_WINDOW_KEYS = {
+    "alt+f4",
+    "alt_l+f4",
+    "alt_r+f4",
+    "control_l+q",
+    "control_l+w",
+    "control_r+q",
+    "control_r+w",
+}
+
+
+@dataclass
+class ScreenshotHandle:
+    """
+    A screenshot that is being captured in the background.
+    """
+
+    path: str
+    command: CommandHandle
+
+
 def map_key(key: str) -> str:
     lower_key = key.lower()
     if lower_key in KEYS:
@@ -85,6 +111,9 @@ class _VNCServer:
         self._port = 6080
         self._novnc_auth_enabled = False
         self._novnc_password = None
+        # Tight encoding levels requested by the noVNC client (0-9)
+        self._quality = 6
+        self._compression = 6
 
         self._url = f"https://{self._port}-{desktop.sandbox_domain}/vnc.html"
         # self._url=""
@@ -127,9 +156,9 @@ class _VNCServer:
             params.append(f"resize={resize}")
         if auth_key:
             params.append(f"password={auth_key}")
-        if params:
-            return f"{self._url}?{'&'.join(params)}"
-        return self._url
+        params.append(f"quality={self._quality}")
+        params.append(f"compression={self._compression}")
+        return f"{self._url}?{'&'.join(params)}"
 
     def get_auth_key(self) -> str:
         if not self._novnc_password:
@@ -144,7 +173,16 @@ class _VNCServer:
         port: Optional[int] = None,
         require_auth: bool = False,
         window_id: Optional[str] = None,
+        quality: Optional[int] = None,
+        compression: Optional[int] = None,
     ) -> None:
+        """
+        Start the VNC server and the noVNC proxy.
+
+        noVNC negotiates Tight encoding with x11vnc first; `quality` sets its
+        JPEG level and `compression` its zlib level, both from 0 to 9.
+        Lower quality and higher compression send fewer bytes per frame.
+        """
         # If stream is already running, throw an error
         if self._check_vnc_running():
             raise RuntimeError("Stream is already running")
@@ -152,6 +190,11 @@ class _VNCServer:
         # Update parameters if provided
         self._vnc_port = vnc_port or self._vnc_port
         self._port = port or self._port
+        for name, level in (("quality", quality), ("compression", compression)):
+            if level is not None and not 0 <= level <= 9:
+                raise ValueError(f"{name} must be between 0 and 9, got {level}")
+        self._quality = self._quality if quality is None else quality
+        self._compression = self._compression if compression is None else compression
         self._novnc_auth_enabled = require_auth or self._novnc_auth_enabled
         self._novnc_password = self._generate_password() if require_auth else None
 
@@ -334,6 +377,8 @@ class Sandbox(SandboxBase):
         base.__class__ = cls
         base._display = display
         base._last_xfce4_pid = None
+        base._cached_screen_size = None
+        base._cached_windows = {}
 
         # 3. Only start desktop on first creation
         if not sandbox_id:
@@ -408,7 +453,12 @@ class Sandbox(SandboxBase):
         return self.__vnc_server
 
     @overload
-    def screenshot(self, format: Literal["stream"]) -> Iterator[bytes]:
+    def screenshot(
+        self,
+        format: Literal["stream"],
+        image_format: Literal["png", "jpeg"] = "png",
+        quality: int = 85,
+    ) -> Iterator[bytes]:
         """
         Take a screenshot and return it as a stream of bytes.
         """
@@ -417,6 +467,8 @@ class Sandbox(SandboxBase):
     def screenshot(
         self,
         format: Literal["bytes"],
+        image_format: Literal["png", "jpeg"] = "png",
+        quality: int = 85,
     ) -> bytearray:
         """
         Take a screenshot and return it as a bytearray.
@@ -425,21 +477,91 @@ class Sandbox(SandboxBase):
     def screenshot(
         self,
         format: Literal["bytes", "stream"] = "bytes",
+        image_format: Literal["png", "jpeg"] = "png",
+        quality: int = 85,
     ):
         """
         Take a screenshot and return it in the specified format.
 
+        The image is encoded inside the sandbox, so 'jpeg' transfers far fewer
+        bytes than lossless 'png' at the cost of some image quality.
+
         :param format: The format of the screenshot. Can be 'bytes', 'blob', or 'stream'.
+        :param image_format: The image encoding. Can be 'png' or 'jpeg'.
+        :param quality: JPEG quality from 1 to 100, ignored for 'png'.
         :returns: The screenshot in the specified format.
         """
-        screenshot_path = f"/tmp/screenshot-{uuid4()}.png"
+        return self.finish_screenshot(
+            self.start_screenshot(image_format, quality), format=format
+        )
+
+    def start_screenshot(
+        self,
+        image_format: Literal["png", "jpeg"] = "png",
+        quality: int = 85,
+    ) -> ScreenshotHandle:
+        """
+        Start capturing a screenshot without waiting for it to finish.
+
+        Starting the next capture before fetching the previous one overlaps
+        the capture in the sandbox with the transfer of the earlier frame.
+
+        :param image_format: The image encoding. Can be 'png' or 'jpeg'.
+        :param quality: JPEG quality from 1 to 100, ignored for 'png'.
+        :returns: Handle to pass to `finish_screenshot`.
+        """
+        if image_format not in SCREENSHOT_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        extension = SCREENSHOT_EXTENSIONS[image_format]
+        screenshot_path = f"/tmp/screenshot-{uuid4()}.{extension}"
+
+        quality_flag = f"--quality {quality} " if image_format == "jpeg" else ""
+        command = self.commands.run(
+            f"DISPLAY={self._display} scrot --pointer {quality_flag}{screenshot_path}",
+            background=True,
+        )
+        return ScreenshotHandle(path=screenshot_path, command=command)
 
-        self.commands.run(f"DISPLAY={self._display} scrot --pointer {screenshot_path}")
+    def finish_screenshot(
+        self,
+        handle: ScreenshotHandle,
+        format: Literal["bytes", "stream"] = "bytes",
+    ):
+        """
+        Wait for a screenshot started with `start_screenshot` and return it.
 
-        file = self.files.read(screenshot_path, format=format)
-        self.files.remove(screenshot_path)
+        :param handle: Handle returned by `start_screenshot`.
+        :param format: The format of the screenshot. Can be 'bytes' or 'stream'.
+        :returns: The screenshot in the specified format.
+        """
+        handle.command.wait()
+        file = self.files.read(handle.path, format=format)
+        self.files.remove(handle.path)
         return file
 
+    def screenshots(
+        self,
+        count: int,
+        image_format: Literal["png", "jpeg"] = "png",
+        quality: int = 85,
+    ) -> Iterator[bytearray]:
+        """
+        Take `count` screenshots, capturing each frame while the previous
+        one is being downloaded.
+
+        :param count: Number of screenshots to take.
+        :param image_format: The image encoding. Can be 'png' or 'jpeg'.
+        :param quality: JPEG quality from 1 to 100, ignored for 'png'.
+        """
+        if count <= 0:
+            return
+        pending = self.start_screenshot(image_format, quality)
+        for i in range(count):
+            current = pending
+            if i + 1 < count:
+                pending = self.start_screenshot(image_format, quality)
+            yield self.finish_screenshot(current)
+
     def left_click(self, x: Optional[int] = None, y: Optional[int] = None):
         """
         Left click on the mouse position.
@@ -538,6 +660,10 @@ class Sandbox(SandboxBase):
         :return: A tuple with the width and height
         :raises RuntimeError: If the screen size cannot be determined
         """
+        # The Xvfb screen is fixed for the lifetime of the sandbox
+        if self._cached_screen_size is not None:
+            return self._cached_screen_size
+
         result = self.commands.run(f"DISPLAY={self._display} xrandr")
 
         _match = re_search(r"(\d+x\d+)", result.stdout)
@@ -547,9 +673,11 @@ class Sandbox(SandboxBase):
             )
 
         try:
-            return tuple(map(int, _match.group(1).split("x")))  # type: ignore
+            width, height = map(int, _match.group(1).split("x"))
+            self._cached_screen_size = (width, height)
         except (ValueError, IndexError) as e:
             raise RuntimeError(f"Invalid screen size format: {_match.group(1)}") from e
+        return self._cached_screen_size
 
     def write(self, text: str, *, chunk_size: int = 25, delay_in_ms: int = 75) -> None:
         """
@@ -581,6 +709,8 @@ class Sandbox(SandboxBase):
             key = map_key(key)
 
         self.commands.run(f"DISPLAY={self._display} xdotool key {key}")
+        if key.lower() in CLOSE_WINDOW_KEYS:
+            self._cached_windows.clear()
 
     def drag(self, fr: tuple[int, int], to: tuple[int, int]):
         """
@@ -608,6 +738,7 @@ class Sandbox(SandboxBase):
 
         :param file_or_url: The file or URL to open.
         """
+        self._cached_windows.clear()
         self.commands.run(
             f"DISPLAY={self._display} xdg-open {file_or_url}", background=True
         )
@@ -620,17 +751,30 @@ class Sandbox(SandboxBase):
             f"DISPLAY={self._display} xdotool getwindowfocus"
         ).stdout.strip()
 
-    def get_application_windows(self, application: str) -> list[str]:
+    def get_application_windows(
+        self, application: str, cached: bool = False
+    ) -> list[str]:
         """
         Get the window IDs of all windows for the given application.
-        """
-        return (
-            self.commands.run(
-                f"DISPLAY={self._display} xdotool search --onlyvisible --class {application}"
+
+        :param application: The application window class to search for.
+        :param cached: Reuse the result of an earlier lookup for the same
+            application. The cache is dropped by `launch()`, `open()` and
+            window-closing key presses, but not when an application exits on
+            its own or is started through `commands.run`.
+        """
+        windows = self._cached_windows.get(application) if cached else None
+        if windows is None:
+            windows = (
+                self.commands.run(
+                    f"DISPLAY={self._display} xdotool search --onlyvisible "
+                    f"--class {application}"
+                )
+                .stdout.strip()
+                .split("\n")
             )
-            .stdout.strip()
-            .split("\n")
-        )
+            self._cached_windows[application] = windows
+        return list(windows)
 
     def get_window_title(self, window_id: str) -> str:
         """
@@ -644,6 +788,7 @@ class Sandbox(SandboxBase):
         """
         Launch an application.
         """
+        self._cached_windows.clear()
         self.commands.run(
             f"DISPLAY={self._display} gtk-launch {application} {uri or ''}",
             background=True,
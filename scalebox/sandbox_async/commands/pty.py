@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 import aiohttp
 
@@ -99,6 +99,26 @@ class Pty:
         except Exception as e:
             raise handle_rpc_exception(e)
 
+    async def send_stdin_batch(
+        self,
+        pid: int,
+        data: Iterable[bytes],
+        request_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Send several inputs to a PTY in a single request.
+
+        The inputs are concatenated as-is, so the PTY receives the same bytes
+        as it would from consecutive `send_stdin` calls.
+
+        :param pid: Process ID of the PTY
+        :param data: Input data chunks to send
+        :param request_timeout: Timeout for the request in **seconds**
+        """
+        payload = b"".join(data)
+        if payload:
+            await self.send_stdin(pid, payload, request_timeout=request_timeout)
+
     async def create(
         self,
         size: PtySize,
@@ -1,4 +1,4 @@
-from io import IOBase
+from io import IOBase, TextIOBase
 from typing import IO, AsyncIterator, List, Literal, Optional, Union, overload
 
 import aiohttp
@@ -232,10 +232,12 @@ class Filesystem:
                 file_content = file_data.encode('utf-8')
             elif isinstance(file_data, bytes):
                 file_content = file_data
+            elif isinstance(file_data, TextIOBase):
+                file_content = file_data.read().encode('utf-8')
             elif isinstance(file_data, IOBase):
-                file_content = file_data.read()
-                if isinstance(file_content, str):
-                    file_content = file_content.encode('utf-8')
+                # Binary file objects are streamed by httpx instead of being read
+                # into memory
+                file_content = file_data
             else:
                 raise ValueError(f"Unsupported data type for file {file_path}")
 
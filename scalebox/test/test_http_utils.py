@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HTTP utility clients in scalebox.utils.
+These tests don't require external services: requests go to local test servers.
+"""
+
+import asyncio
+import socket
+import weakref
+from types import SimpleNamespace
+
+import httpcore
+import httpx
+import pytest
+from aiohttp import web
+
+from scalebox.utils import dns_cache, httpcoreclient, httpxclient
+from scalebox.utils.dns_cache import CachingNetworkBackend, DNSCache
+
+from scalebox.utils.httpcoreclient import (
+    HTTPXCoreTool,
+    _json_dumps,
+    _stdlib_json_dumps,
+)
+from scalebox.utils.httpxclient import HTTPXClient, get_default_client
+
+
+@pytest.fixture
+def no_env_proxies(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+
+
+def test_env_proxies_are_mounted(monkeypatch, no_env_proxies):
+    """Environment proxies still apply although the clients use custom transports."""
+    monkeypatch.setenv("HTTP_PROXY", "http://127.0.0.1:3128")
+    monkeypatch.setenv("NO_PROXY", "localhost")
+    client = HTTPXClient(retries=2)
+    try:
+        for http_client in (client.sync_client, client.async_client):
+            proxied = http_client._transport_for_url(httpx.URL("http://example.com"))
+            assert "Proxy" in type(proxied._pool).__name__
+            direct = http_client._transport_for_url(httpx.URL("http://localhost/"))
+            assert direct is http_client._transport
+    finally:
+        client.close()
+
+
+def test_explicit_proxy_overrides_env(monkeypatch, no_env_proxies):
+    """set_proxy replaces environment proxies instead of mounting both."""
+    monkeypatch.setenv("HTTP_PROXY", "http://127.0.0.1:3128")
+    client = HTTPXClient()
+    try:
+        client.set_proxy("http://127.0.0.1:3129")
+        assert client.sync_client._mounts == {}
+        assert "Proxy" in type(client.sync_client._transport._pool).__name__
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize(
+    "payload", [{1: "a"}, {"k": [1, 2.5, "中"]}, {"big": 2**70}, [None, True]]
+)
+def test_json_encoding_matches_stdlib(payload):
+    """The orjson fast path encodes exactly like the stdlib fallback."""
+    assert _json_dumps(payload) == _stdlib_json_dumps(payload)
+
+
+async def _echo_server():
+    """Start a local aiohttp server that reports what it received."""
+
+    async def handler(request):
+        body = await request.read()
+        if request.path == "/redirect":
+            raise web.HTTPTemporaryRedirect("/echo")
+        return web.json_response(
+            {
+                "length": len(body),
+                "chunked": request.headers.get("Transfer-Encoding") == "chunked",
+            }
+        )
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.parametrize("backend", ["httpx", "aiohttp"])
+def test_streamed_upload_and_pool_status(backend, no_env_proxies):
+    """Streamed bodies are sent as they are produced and pool status is reported."""
+
+    async def body():
+        for _ in range(4):
+            yield b"x" * 65536
+
+    async def run():
+        runner, base_url = await _echo_server()
+        client = HTTPXClient(base_url=base_url, transport_backend=backend)
+        try:
+            response = await client.async_client.post("/upload", content=body())
+            assert response.json() == {"length": 4 * 65536, "chunked": True}
+            response = await client.apost("/json", json_data={"a": 1})
+            assert response.json()["chunked"] is False
+            status = await client.aconnection_pool_status()
+            assert status["total_connections"] == 1
+            assert status["idle_connections"] == 1
+            assert client.connection_pool_status()["total_connections"] == 0
+        finally:
+            await client.aclose()
+            client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_large_json_body_survives_redirect(monkeypatch, no_env_proxies):
+    """A large JSON POST can be replayed when following a 307 redirect."""
+    monkeypatch.setattr(httpcoreclient, "_json_dumps", _stdlib_json_dumps)
+    payload = {"items": ["x" * 1000] * 200}
+    length = len(_stdlib_json_dumps(payload))
+    assert length > httpcoreclient.JSON_STREAM_CHUNK_SIZE
+
+    async def run():
+        runner, base_url = await _echo_server()
+        with pytest.warns(DeprecationWarning):
+            tool = HTTPXCoreTool(base_url=base_url)
+        try:
+            responses = [
+                await tool.async_post("/redirect", json_data=payload),
+                await asyncio.to_thread(tool.post, "/redirect", json_data=payload),
+            ]
+            for response in responses:
+                assert response.url.path == "/echo"
+                assert response.json() == {"length": length, "chunked": False}
+        finally:
+            await tool.aclose()
+            tool.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_host_limit_applies_to_streams_and_core_tool(no_env_proxies):
+    """astream and the HTTPXCoreTool async paths respect the per-host limit."""
+    active = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return web.Response(body=b"ok")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+        client = HTTPXClient(base_url=base_url, max_keepalive_connections=1)
+        with pytest.warns(DeprecationWarning):
+            tool = HTTPXCoreTool(base_url=base_url, max_keepalive_connections=1)
+
+        async def read(stream):
+            async with stream as response:
+                return await response.aread()
+
+        try:
+            bodies = await asyncio.gather(
+                *(read(client.astream("GET", "/s")) for _ in range(3))
+            )
+            assert bodies == [b"ok"] * 3
+            assert peak == 1
+            # The limit is per client: the tool's streams and requests share one
+            results = await asyncio.gather(
+                *(read(tool.async_stream_context("GET", "/t")) for _ in range(3)),
+                *(tool.async_get("/r") for _ in range(3)),
+            )
+            assert [getattr(r, "content", r) for r in results] == [b"ok"] * 6
+            assert peak == 1
+        finally:
+            await client.aclose()
+            client.close()
+            await tool.aclose()
+            tool.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("option", [{"http2": True}, {"retries": 3}])
+def test_aiohttp_backend_rejects_unsupported_options(option):
+    """Options the aiohttp transport cannot honour are rejected up front."""
+    with pytest.raises(ValueError):
+        HTTPXClient(transport_backend="aiohttp", **option)
+
+
+def test_aiohttp_connection_refused(no_env_proxies):
+    """A refused connection surfaces as httpx.ConnectError on the aiohttp backend."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        client = HTTPXClient(
+            base_url=f"http://127.0.0.1:{port}", transport_backend="aiohttp"
+        )
+        try:
+            with pytest.raises(httpx.ConnectError):
+                await client.aget("/")
+        finally:
+            await client.aclose()
+            client.close()
+
+    asyncio.run(run())
+
+
+def test_aiohttp_pool_status_without_connector_internals():
+    """Missing private TCPConnector attributes are counted as zero connections."""
+    transport = httpxclient._AiohttpTransport(httpx.Limits())
+    transport._session = SimpleNamespace(closed=False, connector=object())
+    assert transport.connection_counts() == (0, 0)
+
+
+def test_aiohttp_write_timeout(no_env_proxies):
+    """A peer that stops reading triggers httpx.WriteTimeout on the aiohttp backend."""
+
+    async def body():
+        while True:
+            yield b"x" * 1_000_000
+
+    async def run():
+        stalled = asyncio.Event()
+
+        async def never_read(reader, writer):
+            await stalled.wait()
+            writer.close()
+
+        server = await asyncio.start_server(never_read, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = HTTPXClient(
+            base_url=f"http://127.0.0.1:{port}",
+            timeout=httpx.Timeout(5.0, write=0.5),
+            transport_backend="aiohttp",
+        )
+        try:
+            with pytest.raises(httpx.WriteTimeout):
+                await client.async_client.post("/upload", content=body())
+        finally:
+            stalled.set()
+            await client.aclose()
+            client.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("backend", ["httpx", "aiohttp"])
+def test_reset_client_after_event_loop_closed(backend, no_env_proxies):
+    """Resetting a client used under a finished asyncio.run does not raise."""
+    client = HTTPXClient(transport_backend=backend)
+
+    async def run():
+        runner, base_url = await _echo_server()
+        try:
+            response = await client.aget(f"{base_url}/ping")
+            assert response.status_code == 200
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    old_async_client = client.async_client
+    client.reset_client()
+    assert client.async_client is not old_async_client
+    client.close()
+
+
+def test_default_client_per_event_loop(monkeypatch, no_env_proxies):
+    """Shared clients are keyed on the running loop and usable across asyncio.run."""
+    monkeypatch.setattr(httpxclient, "_default_clients", {})
+    assert get_default_client() is get_default_client()
+
+    async def run():
+        client = get_default_client()
+        assert client is get_default_client()
+        runner, base_url = await _echo_server()
+        try:
+            response = await client.aget(f"{base_url}/ping")
+            assert response.status_code == 200
+        finally:
+            await runner.cleanup()
+        return client
+
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+    assert first is not second
+    assert first not in httpxclient._default_clients.values()
+    assert first.sync_client.is_closed
+
+    httpxclient._close_default_clients()
+    assert second.sync_client.is_closed
+    assert not httpxclient._default_clients
+
+
+def test_clients_support_weak_references():
+    """Both client classes can be referenced weakly despite __slots__."""
+    client = HTTPXClient()
+    with pytest.warns(DeprecationWarning):
+        tool = HTTPXCoreTool()
+    try:
+        assert weakref.ref(client)() is client
+        assert weakref.ref(tool)() is tool
+    finally:
+        client.close()
+        tool.close()
+
+
+def test_default_client_accepts_timeout_objects(monkeypatch, no_env_proxies):
+    """httpx.Timeout arguments are keyed by value; unhashable ones name the argument."""
+    monkeypatch.setattr(httpxclient, "_default_clients", {})
+    client = get_default_client(timeout=httpx.Timeout(5.0))
+    try:
+        assert get_default_client(timeout=httpx.Timeout(5.0)) is client
+        assert get_default_client(timeout=httpx.Timeout(5.0, read=1.0)) is not client
+        with pytest.raises(ValueError, match="'default_headers'"):
+            get_default_client(default_headers={"X-Ids": {1, 2}})
+    finally:
+        httpxclient._close_default_clients()
+
+
+def _addrinfo(*addresses):
+    return [(None, None, None, "", (address, 443)) for address in addresses]
+
+
+def test_dns_cache_entries_expire(monkeypatch):
+    """Entries are served until their TTL passes and are evicted afterwards."""
+    now = [1000.0]
+    monkeypatch.setattr(dns_cache.time, "monotonic", lambda: now[0])
+    cache = DNSCache(ttl=10)
+    cache.put("example.com", 443, _addrinfo("10.0.0.1"))
+    assert cache.get("example.com", 443) == [("10.0.0.1", 443)]
+
+    now[0] += 10
+    assert cache.get("example.com", 443) is None
+    assert cache._entries == {}
+
+    cache.put("a.example.com", 443, _addrinfo("10.0.0.2"))
+    now[0] += 11
+    cache.put("b.example.com", 443, _addrinfo("10.0.0.3"))
+    assert list(cache._entries) == [("b.example.com", 443)]
+
+
+class _FakeBackend(httpcore.NetworkBackend):
+    """Refuses connections to the addresses in `failing`, records every attempt."""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.attempts = []
+
+    def connect_tcp(self, host, port, timeout=None, **kwargs):
+        self.attempts.append((host, timeout))
+        if host in self.failing:
+            raise httpcore.ConnectError(f"refused: {host}")
+        return host
+
+
+def test_caching_backend_falls_back_across_addresses():
+    """A refused address moves on to the next one within the same timeout budget."""
+    cache = DNSCache(ttl=60)
+    cache.put("example.com", 443, _addrinfo("10.0.0.1", "10.0.0.2"))
+    inner = _FakeBackend(failing={"10.0.0.1"})
+    backend = CachingNetworkBackend(inner, cache)
+
+    assert backend.connect_tcp("example.com", 443, timeout=5.0) == "10.0.0.2"
+    assert [host for host, _ in inner.attempts] == ["10.0.0.1", "10.0.0.2"]
+    assert all(0 < timeout <= 5.0 for _, timeout in inner.attempts)
+
+    inner.failing = {"10.0.0.1", "10.0.0.2"}
+    with pytest.raises(httpcore.ConnectError):
+        backend.connect_tcp("example.com", 443, timeout=5.0)
+
+
+def test_dns_cache_is_opt_in(no_env_proxies):
+    """HTTPXClient leaves the httpcore network backend alone unless asked."""
+    client = HTTPXClient()
+    cached = HTTPXClient(dns_cache_ttl=dns_cache.DEFAULT_DNS_TTL)
+    try:
+        backend = client.sync_client._transport._pool._network_backend
+        assert not isinstance(backend, CachingNetworkBackend)
+        backend = cached.sync_client._transport._pool._network_backend
+        assert isinstance(backend, CachingNetworkBackend)
+    finally:
+        client.close()
+        cached.close()
@@ -5,6 +5,11 @@ import os, asyncio
 from browser_use.llm import ChatOpenAI
 import subprocess, pathlib
 
+try:
+    import uvloop
+except ImportError:  # Windows 上没有 uvloop，asyncio.run 默认使用 Proactor 事件循环
+    uvloop = None
+
 load_dotenv()
 os.environ["PLAYWRIGHT_CHROMIUM_EXTRA_ARGS"] = (
     "--no-sandbox --disable-dev-shm-usage --disable-gpu --disable-software-rasterizer"
@@ -78,7 +83,7 @@ async def main():
     # "--disable-gpu",
     # "--disable-software-rasterizer",
     async with async_playwright() as pw:
-        browser = await pw.chromium.launch(
+        async with await pw.chromium.launch(
             proxy={
                 "server": "http://net-proxy:80",
                 "username": "sbx-jz9kgqolumvmfc7ds",
@@ -96,46 +101,40 @@ async def main():
                 "--disable-blink-features=AutomationControlled",  # 禁用自动化控制标志
                 "--start-maximized",  # 最大化窗口
             ],
-        )
-        # task = """
-        #     1. 打开淘宝官网 (taobao.com)
-        #     2. 搜索"格力空调"
-        #     3. 记录下第一款商品的价格和标题
-        #     4. 打开京东官网 (jd.com)
-        #     5. 同样搜索"格力空调"
-        #     6. 记录下第一款商品的价格和标题
-        #     7. 对比在两个平台上看到的第一个商品的价格
-        #     """
-        task = """
-            1. 打开google搜索
-            2、输入今日新闻
-            3、输出第一条内容
-            """
-        # task = """
-        #     1、打开新浪网(http://sina.cn/)
-        #     2. 搜索"科技"
-        #     3. 记录前10条记录
-        #     """
-        agent = Agent(
-            task=task,
-            llm=llm,
-            # browser_profile=browser_profile,
-            browser=browser,
-            use_vision=False,
-        )
-        result = await agent.run()
-        print("---------- 最终结果 ----------")
-        print(result)
-        await browser.close()
-
-
-# if __name__ == "__main__":
-#     asyncio.run(main())
-loop = asyncio.get_event_loop()
-if loop.is_closed():
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-try:
-    loop.run_until_complete(main())
-finally:
-    loop.close()
+        ) as browser:
+            # task = """
+            #     1. 打开淘宝官网 (taobao.com)
+            #     2. 搜索"格力空调"
+            #     3. 记录下第一款商品的价格和标题
+            #     4. 打开京东官网 (jd.com)
+            #     5. 同样搜索"格力空调"
+            #     6. 记录下第一款商品的价格和标题
+            #     7. 对比在两个平台上看到的第一个商品的价格
+            #     """
+            task = """
+                1. 打开google搜索
+                2、输入今日新闻
+                3、输出第一条内容
+                """
+            # task = """
+            #     1、打开新浪网(http://sina.cn/)
+            #     2. 搜索"科技"
+            #     3. 记录前10条记录
+            #     """
+            agent = Agent(
+                task=task,
+                llm=llm,
+                # browser_profile=browser_profile,
+                browser=browser,
+                use_vision=False,
+            )
+            result = await agent.run()
+            print("---------- 最终结果 ----------")
+            print(result)
+
+
+if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
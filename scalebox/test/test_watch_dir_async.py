@@ -6,6 +6,7 @@ an event, asserts events were received, and cleans up.
 """
 
 import asyncio
+import sys
 import time
 import logging
 from typing import List
@@ -19,6 +20,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of buffered event lines written to stdout in one call
+EVENT_FLUSH_THRESHOLD = 64
+
 
 async def main():
     async with await AsyncSandbox.create(
@@ -28,10 +32,18 @@ async def main():
         await sandbox.files.make_dir(watch_path)
 
         events: List[FilesystemEvent] = []
+        pending_lines: List[str] = []
+
+        def flush_events():
+            if pending_lines:
+                sys.stdout.write("\n".join(pending_lines) + "\n")
+                pending_lines.clear()
 
         async def on_event(ev: FilesystemEvent):
-            print(ev)
             events.append(ev)
+            pending_lines.append(str(ev))
+            if len(pending_lines) >= EVENT_FLUSH_THRESHOLD:
+                flush_events()
 
         # Start watching directory
         handle = await sandbox.files.watch_dir(
@@ -48,7 +60,10 @@ async def main():
         await asyncio.sleep(2)
 
         # Stop watching
-        await handle.stop()
+        try:
+            await handle.stop()
+        finally:
+            flush_events()
 
         logger.info(f"Received {len(events)} filesystem events")
         assert len(events) >= 1
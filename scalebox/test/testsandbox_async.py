@@ -1,4 +1,5 @@
 import asyncio
+from typing import Optional
 
 from sandbox_async.main import AsyncSandbox
 
@@ -6,6 +7,10 @@ from scalebox.sandbox.commands.command_handle import PtySize
 
 # from scalebox.sandbox_async.main import AsyncSandbox
 
+# PTY 输入之间的间隔（秒），用于验证长时间空闲后 PTY 仍然可用
+STDIN_INTERVAL = 30
+STDIN_ROUNDS = 10
+
 
 async def pty_output_handler(output):
     """处理 PTY 输出的回调函数"""
@@ -97,6 +102,50 @@ async def main():
     print(f"PTY 是否被杀死: {killed}")
 
 
+async def produce_stdin(queue: "asyncio.Queue[Optional[bytes]]") -> None:
+    """按固定节奏生成 PTY 输入，结束时放入 None"""
+    await queue.put(b'echo "hello"\n')
+    await queue.put(b'echo "world!"\n')
+    for i in range(1, STDIN_ROUNDS + 1):
+        await asyncio.sleep(STDIN_INTERVAL)
+        await queue.put(f'echo "world!" {i * STDIN_INTERVAL}s\n'.encode())
+    await queue.put(None)
+
+
+async def consume_stdin(
+    sandbox: AsyncSandbox, pid: int, queue: "asyncio.Queue[Optional[bytes]]"
+) -> None:
+    """把队列中已就绪的输入合并成一次请求发送给 PTY"""
+    done = False
+    while not done:
+        batch = [await queue.get()]
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        if None in batch:
+            done = True
+            batch = batch[: batch.index(None)]
+        await sandbox.pty.send_stdin_batch(pid=pid, data=batch)
+
+
+# PTY 输入队列示例：等待期间不阻塞事件循环
+async def pty_queue_example():
+    sandbox = await AsyncSandbox.create(timeout=3600)
+    pty = await sandbox.pty.create(
+        size=PtySize(1024, 768),
+        on_data=pty_output_handler,
+        user="root",
+        cwd="/root/",
+        request_timeout=3600,
+    )
+
+    queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+    await asyncio.gather(produce_stdin(queue), consume_stdin(sandbox, pty.pid, queue))
+
+    result = await pty.wait()
+    print("exit_code =", result.exit_code)
+    print("full_output =", result.stdout)
+
+
 # 静态方法使用示例
 async def static_methods_example():
     # 1. 创建沙箱
@@ -167,6 +216,7 @@ async def context_manager_example():
 
 if __name__ == "__main__":
     asyncio.run(main())
+    # asyncio.run(pty_queue_example())
     # asyncio.run(static_methods_example())
     # asyncio.run(connect_example())
     # asyncio.run(context_manager_example())
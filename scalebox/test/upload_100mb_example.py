@@ -9,10 +9,21 @@
 4. 验证上传结果
 """
 
+import asyncio
+import hashlib
+import mmap
 import os
+import shlex
+import socket
 import time
 import logging
 from io import BytesIO
+from typing import Optional, Sequence
+
+import httpx
+
+from scalebox.generated.api import ahandle_envd_api_exception
+from scalebox.sandbox_async.main import AsyncSandbox
 from scalebox.sandbox_sync.main import Sandbox
 from scalebox.connection_config import ConnectionConfig
 
@@ -22,13 +33,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401  # httpx 的 HTTP/2 支持依赖 h2
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 流式上传时的本地读缓冲大小
+STREAM_READ_BUFFER = 1 << 20  # 1MB
+
+# 分片上传时生产者最多领先消费者的分片数
+PART_QUEUE_SIZE = 4
+
+# 在沙箱内合并分片：copy_file_range 在内核中完成拷贝（CoW 文件系统上可直接共享数据块），
+# 合并成功后在同一进程中删除分片。参数: 目标文件 分片...
+# copy_file_range 不可用或报错 (EXDEV/ENOSYS/EINVAL 等) 时从当前偏移继续用普通读写拷贝
+MERGE_PARTS_SCRIPT = """
+import os, shutil, sys
+dest, parts = sys.argv[1], sys.argv[2:]
+with open(dest, "wb") as out:
+    for part in parts:
+        with open(part, "rb") as src:
+            remaining = os.fstat(src.fileno()).st_size
+            if hasattr(os, "copy_file_range"):
+                try:
+                    while remaining > 0:
+                        copied = os.copy_file_range(
+                            src.fileno(), out.fileno(), remaining
+                        )
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                except OSError:
+                    pass
+            if remaining > 0:
+                shutil.copyfileobj(src, out)
+for part in parts:
+    os.unlink(part)
+"""
+
 
-def create_100mb_test_file(file_path: str = "/home/test_100mb.bin") -> str:
+def create_100mb_test_file(
+    file_path: str = "/home/test_100mb.bin", fill_pattern: bool = True
+) -> str:
     """
     创建一个 100MB 的测试文件
 
     Args:
         file_path: 本地文件路径
+        fill_pattern: 为 False 时只写入第一个 1MB 模式块，其余部分用
+            posix_fallocate 直接分配（内容为 0），适合只关心文件大小的测试
 
     Returns:
         创建的文件路径
@@ -40,11 +95,24 @@ def create_100mb_test_file(file_path: str = "/home/test_100mb.bin") -> str:
     file_size = 1000 * 1024 * 1024  # 100MB
     chunk_size = 1024 * 1024  # 1MB 块大小
 
+    # 每个字节为 (偏移 % 256)；块大小是 256 的整数倍，所以每个块内容相同，
+    # 只需在循环外生成一次
+    chunk_data = bytes(range(256)) * (chunk_size // 256)
+
+    if not fill_pattern and hasattr(os, "posix_fallocate"):
+        with open(file_path, "wb") as f:
+            f.write(chunk_data)
+            f.flush()
+            os.posix_fallocate(f.fileno(), 0, file_size)
+        logger.info(
+            f"文件已预分配: {file_size / (1024*1024):.2f}MB, "
+            f"耗时: {time.time() - start_time:.2f}秒"
+        )
+        return file_path
+
     with open(file_path, "wb") as f:
         written = 0
         while written < file_size:
-            # 生成 1MB 的数据块，包含一些模式以便验证
-            chunk_data = bytes([(i + written) % 256 for i in range(chunk_size)])
             f.write(chunk_data)
             written += chunk_size
 
@@ -62,56 +130,139 @@ def create_100mb_test_file(file_path: str = "/home/test_100mb.bin") -> str:
     return file_path
 
 
-def upload_file_to_sandbox(
-    local_file_path: str, sandbox_path: str = "/tmp/uploaded_100mb.bin"
-):
+def sha256_of_local_file(file_path: str, block_size: int = 1024 * 1024) -> str:
     """
-    将本地文件上传到沙箱
+    计算本地文件的 SHA-256
+
+    Python 3.11+ 使用 hashlib.file_digest，在 C 层循环读取并释放 GIL；
+    更早的版本通过 mmap 按块切片送入 hashlib，避免为每块分配新的 bytes
+    """
+    if hasattr(hashlib, "file_digest"):
+        with open(file_path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    digest = hashlib.sha256()
+    if os.path.getsize(file_path) == 0:
+        return digest.hexdigest()
+
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, len(view), block_size):
+                    digest.update(view[offset : offset + block_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def sha256_in_sandbox(sandbox: Sandbox, sandbox_path: str) -> str:
+    """在沙箱内通过 sha256sum 计算文件的 SHA-256"""
+    proc = sandbox.commands.run(f"sha256sum {shlex.quote(sandbox_path)}")
+    return proc.stdout.split()[0]
+
+
+def upload_if_missing(
+    sandbox: Sandbox,
+    local_file_path: str,
+    sandbox_path: str,
+    candidates: Sequence[str] = (),
+) -> bool:
+    """
+    按内容去重上传：沙箱内已有相同 SHA-256 的文件时直接在沙箱内复制，否则流式上传
 
     Args:
+        sandbox: 目标沙箱
         local_file_path: 本地文件路径
         sandbox_path: 沙箱中的目标路径
+        candidates: 沙箱中可能已有相同内容的文件路径（目标路径本身总会被检查）
+
+    Returns:
+        是否跳过了上传
     """
-    logger.info("开始连接沙箱...")
+    local_digest = sha256_of_local_file(local_file_path)
+
+    # 一次命令算出所有候选文件的摘要，不存在的文件直接忽略
+    paths = [sandbox_path, *(c for c in candidates if c != sandbox_path)]
+    quoted = " ".join(shlex.quote(path) for path in paths)
+    proc = sandbox.commands.run(f"sha256sum {quoted} 2>/dev/null || true")
+    for line in proc.stdout.splitlines():
+        digest, _, path = line.partition("  ")
+        if digest != local_digest:
+            continue
+        if path != sandbox_path:
+            sandbox.commands.run(
+                f"cp --reflink=auto {shlex.quote(path)} {shlex.quote(sandbox_path)}"
+            )
+        logger.info(f"沙箱内已有相同内容 {path}，跳过上传 (sha256={local_digest})")
+        return True
+
+    with open(local_file_path, "rb", buffering=STREAM_READ_BUFFER) as f:
+        sandbox.files.write(sandbox_path, f, "root", 3600)
+    return False
+
 
-    # 创建沙箱连接配置
-    sandbox = Sandbox.create(
+def create_upload_sandbox() -> Sandbox:
+    """创建用于上传示例的沙箱"""
+    return Sandbox.create(
         timeout=3600,
         # debug=True,
         metadata={"test": "code_interpreter_validation"},
         envs={"CI_TEST": "sync_test"},
     )
 
+
+def kill_sandbox(sandbox: Sandbox) -> None:
+    """清理沙箱，失败时只记录警告"""
+    try:
+        sandbox.kill()
+        logger.info("沙箱已清理")
+    except Exception as e:
+        logger.warning(f"清理沙箱时发生错误: {e}")
+
+
+def upload_file_to_sandbox(
+    local_file_path: str,
+    sandbox_path: str = "/tmp/uploaded_100mb.bin",
+    sandbox: Optional[Sandbox] = None,
+):
+    """
+    将本地文件上传到沙箱
+
+    Args:
+        local_file_path: 本地文件路径
+        sandbox_path: 沙箱中的目标路径
+        sandbox: 复用的沙箱，为空时自行创建并在结束后清理
+    """
+    owns_sandbox = sandbox is None
+    if owns_sandbox:
+        logger.info("开始连接沙箱...")
+        sandbox = create_upload_sandbox()
+
     try:
         # 检查沙箱是否运行
-        if not sandbox.is_running():
+        if owns_sandbox and not sandbox.is_running():
             logger.error("沙箱未运行，无法上传文件")
             return False
 
         logger.info(f"沙箱连接成功，ID: {sandbox.sandbox_id}")
 
-        # 读取本地文件
-        logger.info(f"读取本地文件: {local_file_path}")
-        start_time = time.time()
-
-        with open(local_file_path, "rb") as f:
-            file_data = f.read()
-
-        read_time = time.time() - start_time
+        file_size = os.path.getsize(local_file_path)
         logger.info(
-            f"文件读取完成: {len(file_data) / (1024*1024):.2f}MB, 耗时: {read_time:.2f}秒"
+            f"本地文件: {local_file_path}, 大小: {file_size / (1024*1024):.2f}MB"
         )
 
         # 上传文件到沙箱
         logger.info(f"开始上传文件到沙箱: {sandbox_path}")
         upload_start = time.time()
 
-        # 使用 filesystem.write 方法上传文件
-        result = sandbox.files.write(sandbox_path, file_data, "root", 3600)
+        # 直接传入文件对象，由 filesystem.write 从磁盘流式上传，不整体读入内存
+        with open(local_file_path, "rb") as f:
+            result = sandbox.files.write(sandbox_path, f, "root", 3600)
 
         upload_time = time.time() - upload_start
         logger.info(f"文件上传完成: {result.path}, 耗时: {upload_time:.2f}秒")
-        logger.info(f"上传速度: {len(file_data) / (1024*1024) / upload_time:.2f} MB/s")
+        logger.info(f"上传速度: {file_size / (1024*1024) / upload_time:.2f} MB/s")
 
         # 验证上传结果
         logger.info("验证上传结果...")
@@ -125,19 +276,17 @@ def upload_file_to_sandbox(
             file_info = sandbox.files.get_info(sandbox_path)
             logger.info(f"文件信息: {file_info}")
 
-            # 读取文件内容进行验证（只读取前1MB进行快速验证）
+            # 比较本地与沙箱内计算的 SHA-256，无需把文件下载回本地
             logger.info("验证文件内容...")
-            with open(local_file_path, "rb") as f:
-                local_sample = f.read(1024 * 1024)  # 读取前1MB
-
-            sandbox_sample = sandbox.files.read(sandbox_path, format="bytes")[
-                : 1024 * 1024
-            ]
+            local_digest = sha256_of_local_file(local_file_path)
+            sandbox_digest = sha256_in_sandbox(sandbox, sandbox_path)
 
-            if local_sample == sandbox_sample:
-                logger.info("✅ 文件内容验证成功")
+            if local_digest == sandbox_digest:
+                logger.info(f"✅ 文件内容验证成功 (sha256={local_digest})")
             else:
-                logger.error("❌ 文件内容验证失败")
+                logger.error(
+                    f"❌ 文件内容验证失败: 本地={local_digest}, 沙箱={sandbox_digest}"
+                )
                 return False
 
         else:
@@ -157,15 +306,14 @@ def upload_file_to_sandbox(
 
     finally:
         # 清理沙箱
-        try:
-            sandbox.kill()
-            logger.info("沙箱已清理")
-        except Exception as e:
-            logger.warning(f"清理沙箱时发生错误: {e}")
+        if owns_sandbox:
+            kill_sandbox(sandbox)
 
 
 def upload_file_streaming(
-    local_file_path: str, sandbox_path: str = "/tmp/uploaded_100mb_streaming.bin"
+    local_file_path: str,
+    sandbox_path: str = "/tmp/uploaded_100mb_streaming.bin",
+    sandbox: Optional[Sandbox] = None,
 ):
     """
     使用真正的流式方式上传文件（不将整个文件读入内存）。
@@ -176,18 +324,16 @@ def upload_file_streaming(
     Args:
         local_file_path: 本地文件路径
         sandbox_path: 沙箱中的目标路径
+        sandbox: 复用的沙箱，为空时自行创建并在结束后清理
     """
     logger.info("开始流式上传文件...")
 
-    sandbox = Sandbox.create(
-        timeout=3600,
-        # debug=True,
-        metadata={"test": "code_interpreter_validation"},
-        envs={"CI_TEST": "sync_test"},
-    )
+    owns_sandbox = sandbox is None
+    if owns_sandbox:
+        sandbox = create_upload_sandbox()
 
     try:
-        if not sandbox.is_running():
+        if owns_sandbox and not sandbox.is_running():
             logger.error("沙箱未运行，无法上传文件")
             return False
 
@@ -198,7 +344,10 @@ def upload_file_streaming(
 
         start_time = time.time()
 
-        with open(local_file_path, "rb") as f:
+        # 1MB 缓冲减少 read 系统调用；提示内核按顺序读取以加大预读
+        with open(local_file_path, "rb", buffering=STREAM_READ_BUFFER) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
             sandbox.files.write(sandbox_path, f, "root", 3600)
 
         upload_time = time.time() - start_time
@@ -219,93 +368,161 @@ def upload_file_streaming(
         return False
 
     finally:
-        try:
-            sandbox.kill()
-            logger.info("沙箱已清理")
-        except Exception as e:
-            logger.warning(f"清理沙箱时发生错误: {e}")
+        if owns_sandbox:
+            kill_sandbox(sandbox)
 
 
-def upload_file_chunked_32m(
-    local_file_path: str, sandbox_path: str = "/tmp/uploaded_100mb_chunked_32m.bin"
+def create_part_upload_client(
+    sandbox: AsyncSandbox, max_connections: int
+) -> httpx.AsyncClient:
+    """
+    创建专用于分片上传的 HTTP 客户端
+
+    - 安装了 h2 时启用 HTTP/2，多个分片复用同一连接并行传输
+    - 开启 TCP_NODELAY，避免小的请求头帧被 Nagle 算法延迟
+
+    Args:
+        sandbox: 目标沙箱
+        max_connections: 最大连接数
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+        proxy=sandbox.connection_config.proxy,
+    )
+    return httpx.AsyncClient(
+        base_url=sandbox.envd_api_url,
+        transport=transport,
+        headers=sandbox.connection_config.headers,
+        timeout=sandbox.connection_config.request_timeout,
+    )
+
+
+async def upload_file_chunked_32m_async(
+    local_file_path: str,
+    sandbox_path: str = "/tmp/uploaded_100mb_chunked_32m.bin",
+    concurrency: int = 6,
+    sandbox_id: Optional[str] = None,
 ):
     """
-    使用客户端 32MB 分片方式上传：
-    - 本地读取 32MB 分片，逐片上传为临时文件 {sandbox_path}.partXXXXXX
-    - 在沙箱内通过 `cat` 合并为最终文件
-    - 合并成功后删除临时分片
+    使用客户端分片并发上传：
+    - 通过 mmap 将本地文件按 8MB 切成 memoryview 分片，避免额外拷贝
+    - 生产者把分片放入有界队列，concurrency 个消费者并发上传为临时文件
+      {sandbox_path}.partXXXXXX；队列满时生产者等待，内存占用有上限。
+      所有分片共用一个支持 HTTP/2 的客户端
+    - 在沙箱内通过 copy_file_range 合并为最终文件，并在同一条命令中删除临时分片
 
     Args:
         local_file_path: 本地文件路径
         sandbox_path: 沙箱中的目标路径（合并后的最终文件路径）
+        concurrency: 同时上传的最大分片数
+        sandbox_id: 复用的沙箱 ID，为空时自行创建并在结束后清理
     """
     logger.info("开始 32MB 分片上传...")
 
-    sandbox = Sandbox.create(
-        template="code-interpreter",
-        timeout=3600,
-        # debug=True,
-        metadata={"test": "code_interpreter_validation"},
-        envs={"CI_TEST": "sync_test"},
-    )
+    owns_sandbox = sandbox_id is None
+    if owns_sandbox:
+        sandbox = await AsyncSandbox.create(
+            template="code-interpreter",
+            timeout=3600,
+            # debug=True,
+            metadata={"test": "code_interpreter_validation"},
+            envs={"CI_TEST": "sync_test"},
+        )
+    else:
+        sandbox = await AsyncSandbox.connect(sandbox_id)
 
     try:
-        if not sandbox.is_running():
+        if owns_sandbox and not await sandbox.is_running():
             logger.error("沙箱未运行，无法上传文件")
             return False
 
         file_size = os.path.getsize(local_file_path)
         logger.info(f"文件大小: {file_size / (1024*1024):.2f}MB")
+        if file_size == 0:
+            logger.error("未读取到任何分片，上传失败")
+            return False
 
         chunk_size = 8 * 1024 * 1024  # 32MB 客户端缓存/分片大小
+        part_count = (file_size + chunk_size - 1) // chunk_size
+        uploaded_parts = [
+            f"{sandbox_path}.part{index:06d}" for index in range(part_count)
+        ]
         start_time = time.time()
-
-        part_index = 0
-        uploaded_parts = []
-
-        with open(local_file_path, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-
-                part_name = f"{sandbox_path}.part{part_index:06d}"
+        # 队列中只放分片编号，分片视图在消费者内创建并及时释放，
+        # 出错时不会有残留的视图导致 mmap 无法关闭 (BufferError)
+        queue: "asyncio.Queue[Optional[int]]" = asyncio.Queue(maxsize=PART_QUEUE_SIZE)
+
+        async def produce_parts() -> None:
+            for index in range(part_count):
+                await queue.put(index)
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def upload_parts(view: memoryview) -> None:
+            while (part_index := await queue.get()) is not None:
+                part_name = uploaded_parts[part_index]
+                offset = part_index * chunk_size
+                with view[offset : offset + chunk_size] as part:
+                    part_data = bytes(part)
                 t0 = time.time()
-                sandbox.files.write(part_name, chunk)
+                r = await client.post(
+                    "/upload",
+                    files=[("file", (part_name, part_data))],
+                    data={"path": part_name},
+                )
+                err = await ahandle_envd_api_exception(r)
+                if err:
+                    raise err
                 dt = time.time() - t0
-                uploaded_parts.append(part_name)
                 logger.info(
-                    f"已上传分片 #{part_index} -> {part_name} 大小={(len(chunk)/(1024*1024)):.2f}MB, 用时={dt:.2f}s"
+                    f"已上传分片 #{part_index} -> {part_name} "
+                    f"大小={(len(part_data)/(1024*1024)):.2f}MB, 用时={dt:.2f}s"
                 )
-                part_index += 1
 
-        if not uploaded_parts:
-            logger.error("未读取到任何分片，上传失败")
-            return False
-
-        # 在沙箱中合并分片，确保按编号顺序连接
+        async with create_part_upload_client(sandbox, concurrency) as client:
+            with open(local_file_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        tasks = [asyncio.create_task(produce_parts())] + [
+                            asyncio.create_task(upload_parts(view))
+                            for _ in range(concurrency)
+                        ]
+                        try:
+                            await asyncio.gather(*tasks)
+                        except BaseException:
+                            # 任一协程失败时取消其余协程，避免生产者阻塞在满队列上
+                            for task in tasks:
+                                task.cancel()
+                            await asyncio.gather(*tasks, return_exceptions=True)
+                            raise
+
+        # 在沙箱中按编号顺序合并分片，合并成功后删除分片；沙箱内没有 python3 时用 cat
         logger.info("开始在沙箱内合并分片...")
-        concat_cmd = f"bash -lc 'cat {' '.join(uploaded_parts)} > {sandbox_path}'"
-        proc = sandbox.commands.run(concat_cmd)
+        python_merge = shlex.join(
+            ["python3", "-c", MERGE_PARTS_SCRIPT, sandbox_path, *uploaded_parts]
+        )
+        quoted_parts = " ".join(shlex.quote(part) for part in uploaded_parts)
+        merge_cmd = (
+            f"if command -v python3 >/dev/null 2>&1; then {python_merge}; "
+            f"else cat {quoted_parts} > {shlex.quote(sandbox_path)} "
+            f"&& rm -f {quoted_parts}; fi"
+        )
+        proc = await sandbox.commands.run(merge_cmd)
         if proc.exit_code != 0:
             logger.error(f"合并失败: exit={proc.exit_code}, stderr=\n{proc.stderr}")
             return False
 
         # 校验合并后的文件大小
-        info = sandbox.files.get_info(sandbox_path)
+        info = await sandbox.files.get_info(sandbox_path)
         if info.size != file_size:
             logger.error(f"合并后大小不一致: 期望={file_size}, 实际={info.size}")
             return False
 
-        # 删除分片
-        logger.info("删除沙箱内临时分片...")
-        rm_cmd = f"bash -lc 'rm -f {sandbox_path}.part*'"
-        rm_proc = sandbox.commands.run(rm_cmd)
-        if rm_proc.exit_code != 0:
-            logger.warning(
-                f"删除分片警告: exit={rm_proc.exit_code}, stderr=\n{rm_proc.stderr}"
-            )
-
         total_time = time.time() - start_time
         logger.info(
             f"✅ 32MB 分片上传完成，总耗时={total_time:.2f}s，平均速度={(file_size/(1024*1024))/total_time:.2f} MB/s"
@@ -316,11 +533,33 @@ def upload_file_chunked_32m(
         logger.error(f"32MB 分片上传过程中发生错误: {e}")
         return False
     finally:
-        try:
-            sandbox.kill()
-            logger.info("沙箱已清理")
-        except Exception as e:
-            logger.warning(f"清理沙箱时发生错误: {e}")
+        if owns_sandbox:
+            try:
+                await sandbox.kill()
+                logger.info("沙箱已清理")
+            except Exception as e:
+                logger.warning(f"清理沙箱时发生错误: {e}")
+
+
+def upload_file_chunked_32m(
+    local_file_path: str,
+    sandbox_path: str = "/tmp/uploaded_100mb_chunked_32m.bin",
+    sandbox: Optional[Sandbox] = None,
+):
+    """
+    使用客户端 32MB 分片方式上传（并发版本的同步入口）
+
+    Args:
+        local_file_path: 本地文件路径
+        sandbox_path: 沙箱中的目标路径（合并后的最终文件路径）
+        sandbox: 复用的沙箱，为空时自行创建并在结束后清理
+    """
+    sandbox_id = sandbox.sandbox_id if sandbox is not None else None
+    return asyncio.run(
+        upload_file_chunked_32m_async(
+            local_file_path, sandbox_path, sandbox_id=sandbox_id
+        )
+    )
 
 
 def main():
@@ -330,10 +569,20 @@ def main():
     # 1. 创建 100MB 测试文件
     local_file = create_100mb_test_file()
 
+    # 三种上传方式共用同一个沙箱，只付出一次创建开销
+    logger.info("开始连接沙箱...")
+    sandbox = create_upload_sandbox()
+
     try:
+        if not sandbox.is_running():
+            logger.error("沙箱未运行，无法上传文件")
+            return
+
         # 2. 方式一：直接上传整个文件
         logger.info("\n=== 方式一：直接上传 ===")
-        success1 = upload_file_to_sandbox(local_file, "/tmp/uploaded_100mb_direct.bin")
+        success1 = upload_file_to_sandbox(
+            local_file, "/tmp/uploaded_100mb_direct.bin", sandbox=sandbox
+        )
 
         if success1:
             logger.info("✅ 直接上传成功")
@@ -343,7 +592,7 @@ def main():
         # 3. 方式二：流式分块上传
         logger.info("\n=== 方式二：流式上传 ===")
         success2 = upload_file_streaming(
-            local_file, "/home/uploaded_100mb_streaming.bin"
+            local_file, "/home/uploaded_100mb_streaming.bin", sandbox=sandbox
         )
 
         if success2:
@@ -354,7 +603,7 @@ def main():
         # 4. 方式三：32MB 分片上传（客户端分片 + 服务器端合并）
         logger.info("\n=== 方式三：32MB 分片上传 ===")
         success3 = upload_file_chunked_32m(
-            local_file, "/tmp/uploaded_100mb_chunked_32m.bin"
+            local_file, "/tmp/uploaded_100mb_chunked_32m.bin", sandbox=sandbox
         )
 
         if success3:
@@ -362,7 +611,26 @@ def main():
         else:
             logger.error("❌ 32MB 分片上传失败")
 
+        # 5. 内容去重：沙箱中已有相同文件，只在沙箱内复制
+        logger.info("\n=== 方式四：按内容去重上传 ===")
+        start_time = time.time()
+        skipped = upload_if_missing(
+            sandbox,
+            local_file,
+            "/tmp/uploaded_100mb_dedup.bin",
+            candidates=[
+                "/tmp/uploaded_100mb_direct.bin",
+                "/home/uploaded_100mb_streaming.bin",
+                "/tmp/uploaded_100mb_chunked_32m.bin",
+            ],
+        )
+        logger.info(
+            f"✅ 去重上传完成 (跳过上传={skipped})，耗时: {time.time() - start_time:.2f}秒"
+        )
+
     finally:
+        kill_sandbox(sandbox)
+
         # 4. 清理本地测试文件
         try:
             os.remove(local_file)
@@ -0,0 +1,184 @@
+import ipaddress
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import anyio
+import httpcore
+
+# 开启 DNS 缓存时推荐的有效期(秒)，HTTPXClient 默认不开启
+DEFAULT_DNS_TTL = 300.0
+
+_AddrInfo = List[Tuple[str, int]]
+
+
+class DNSCache:
+    """
+    带 TTL 的 getaddrinfo 结果缓存，同步与异步连接共用
+
+    过期前同一 (host, port) 只解析一次，避免每个新连接都走一次阻塞的系统解析器
+    """
+
+    def __init__(self, ttl: float = DEFAULT_DNS_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, _AddrInfo]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str, port: int) -> Optional[_AddrInfo]:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[(host, port)]
+                return None
+        return entry[1]
+
+    def put(self, host: str, port: int, infos: Iterable[tuple]) -> _AddrInfo:
+        # 只保留地址，去重并保持系统返回的优先顺序
+        addresses = list(dict.fromkeys((info[4][0], info[4][1]) for info in infos))
+        now = time.monotonic()
+        with self._lock:
+            # 顺带清理过期条目，避免不再访问的主机一直留在缓存中
+            expired = [
+                key for key, (expiry, _) in self._entries.items() if expiry <= now
+            ]
+            for key in expired:
+                del self._entries[key]
+            self._entries[(host, port)] = (now + self.ttl, addresses)
+        return addresses
+
+    def resolve(self, host: str, port: int) -> _AddrInfo:
+        addresses = self.get(host, port)
+        if addresses is None:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = self.put(host, port, infos)
+        return addresses
+
+    async def aresolve(self, host: str, port: int) -> _AddrInfo:
+        addresses = self.get(host, port)
+        if addresses is None:
+            infos = await anyio.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = self.put(host, port, infos)
+        return addresses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise httpcore.ConnectTimeout("Timed out connecting to all addresses")
+    return remaining
+
+
+class CachingNetworkBackend(httpcore.NetworkBackend):
+    """
+    在 httpcore 同步网络后端前解析并缓存主机地址，TLS 仍使用原始主机名
+
+    依次尝试解析出的各个地址，所有尝试共用一个连接超时
+    """
+
+    def __init__(self, backend: httpcore.NetworkBackend, cache: DNSCache):
+        self._backend = backend
+        self._cache = cache
+
+    def connect_tcp(
+        self, host: str, port: int, timeout: Optional[float] = None, **kwargs
+    ) -> httpcore.NetworkStream:
+        if _is_ip(host):
+            return self._backend.connect_tcp(host, port, timeout=timeout, **kwargs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        error: Optional[Exception] = None
+        for address, _ in self._cache.resolve(host, port):
+            try:
+                return self._backend.connect_tcp(
+                    address, port, timeout=_remaining(deadline), **kwargs
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error or httpcore.ConnectError(f"No address found for {host}")
+
+    def connect_unix_socket(self, path: str, **kwargs) -> httpcore.NetworkStream:
+        return self._backend.connect_unix_socket(path, **kwargs)
+
+    def sleep(self, seconds: float) -> None:
+        self._backend.sleep(seconds)
+
+
+class AsyncCachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """异步版本的 CachingNetworkBackend"""
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, cache: DNSCache):
+        self._backend = backend
+        self._cache = cache
+
+    async def connect_tcp(
+        self, host: str, port: int, timeout: Optional[float] = None, **kwargs
+    ) -> httpcore.AsyncNetworkStream:
+        if _is_ip(host):
+            return await self._backend.connect_tcp(
+                host, port, timeout=timeout, **kwargs
+            )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        error: Optional[Exception] = None
+        for address, _ in await self._cache.aresolve(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=_remaining(deadline), **kwargs
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error or httpcore.ConnectError(f"No address found for {host}")
+
+    async def connect_unix_socket(
+        self, path: str, **kwargs
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, **kwargs)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# 进程内共享的缓存，DNS 结果与具体客户端无关
+_shared_caches: Dict[float, DNSCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_dns_cache(ttl: float = DEFAULT_DNS_TTL) -> DNSCache:
+    """获取指定 TTL 的进程级共享 DNS 缓存"""
+    with _shared_lock:
+        cache = _shared_caches.get(ttl)
+        if cache is None:
+            cache = _shared_caches[ttl] = DNSCache(ttl)
+        return cache
+
+
+def install_dns_cache(
+    pool: Union[httpcore.ConnectionPool, httpcore.AsyncConnectionPool],
+    ttl: float = DEFAULT_DNS_TTL,
+) -> None:
+    """
+    为 httpcore 连接池的网络后端加上 DNS 缓存
+
+    httpx 的传输层不公开 network_backend 参数，因此直接包装连接池已有的后端
+    """
+    cache = get_dns_cache(ttl)
+    backend = pool._network_backend
+    if isinstance(pool, httpcore.AsyncConnectionPool):
+        pool._network_backend = AsyncCachingNetworkBackend(backend, cache)
+    else:
+        pool._network_backend = CachingNetworkBackend(backend, cache)
@@ -1,26 +1,105 @@
 import contextlib
+import functools
 import json
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import warnings
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlencode
+
+import httpx
+
+from .httpxclient import HTTPXClient
+
+# 标准库回退时按块编码 JSON 的块大小
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+# 与 orjson 的输出保持一致：紧凑分隔符、直接输出 UTF-8
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _iter_json(obj: Any) -> Iterator[bytes]:
+    """用 iterencode 按块编码，避免同时持有完整的 str 与 bytes"""
+    parts = []
+    size = 0
+    for part in _json_encoder.iterencode(obj):
+        parts.append(part)
+        size += len(part)
+        if size >= JSON_STREAM_CHUNK_SIZE:
+            yield "".join(parts).encode("utf-8")
+            parts.clear()
+            size = 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+def _stdlib_json_dumps(obj: Any) -> bytes:
+    """
+    按块编码后拼接为 bytes
+
+    请求体始终是 bytes：跟随 307/308 重定向时 httpx 需要重新发送请求体，
+    一次性的分块迭代器无法重放
+    """
+    return b"".join(_iter_json(obj))
+
+
+# 解析始终使用标准库：orjson 会把超出 64 位的整数解析为 float
+_json_loads = json.loads
 
-import httpcore
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖 (scalebox-sdk[orjson])，未安装时使用标准库
+    _json_dumps = _stdlib_json_dumps
+else:
+
+    def _json_dumps(obj: Any) -> bytes:
+        """orjson 一次生成 bytes，无需再 encode；不支持的输入交给标准库处理"""
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _stdlib_json_dumps(obj)
 
 
 class HTTPXCoreTool:
     """
     基于 httpcore 的高级 HTTP 工具类
     支持同步/异步请求、连接池管理、流式传输等
+
+    已弃用：请直接使用 HTTPXClient。本类现在是 HTTPXClient 的兼容封装，
+    每个实例持有自己的 HTTPXClient 与连接池，不与其他实例共享
+
+    注意：请求与流式方法返回 httpx.Response 而不是 httpcore.Response，
+    状态码改用 .status_code，流式读取改用 .iter_bytes()/.aiter_bytes()
     """
 
+    __slots__ = (
+        "_client",
+        "base_url",
+        "timeout",
+        "http2",
+        "ssl_verify",
+        "default_headers",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         base_url: str = "",
         timeout: float = 10.0,
         max_connections: int = 100,
-        max_keepalive_connections: int = 50,
-        keepalive_expiry: float = 5.0,
-        http2: bool = False,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 60.0,
+        http2: Optional[bool] = None,
         ssl_verify: bool = True,
         headers: Optional[Dict[str, str]] = None,
+        dns_cache_ttl: Optional[float] = None,
     ):
         """
         初始化 HTTP 客户端
@@ -28,47 +107,46 @@ class HTTPXCoreTool:
         :param base_url: 基础 URL 前缀
         :param timeout: 请求超时时间(秒)
         :param max_connections: 最大连接数
-        :param max_keepalive_connections: 最大空闲连接数
+        :param max_keepalive_connections: 最大空闲连接数，默认等于 max_connections
         :param keepalive_expiry: 空闲连接超时时间(秒)
-        :param http2: 是否启用 HTTP/2
+        :param http2: 是否启用 HTTP/2，默认在安装了 h2 时启用
         :param ssl_verify: 是否验证 SSL 证书
         :param headers: 默认请求头
+        :param dns_cache_ttl: DNS 解析结果缓存时间(秒)，默认 None 不缓存；
+            可设为 dns_cache.DEFAULT_DNS_TTL 等值开启
         """
-        self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
-        self.http2 = http2
-        self.ssl_verify = ssl_verify
-        self.default_headers = headers or {}
-
-        # 创建同步连接池
-        self.sync_pool = httpcore.ConnectionPool(
-            max_connections=max_connections,
-            max_keepalive_connections=max_keepalive_connections,
-            keepalive_expiry=keepalive_expiry,
-            http2=http2,
-            ssl_context=(
-                None if ssl_verify else httpcore._ssl.create_untrusted_context()
-            ),
+        warnings.warn(
+            "HTTPXCoreTool is deprecated, use HTTPXClient instead. "
+            "Its methods now return httpx.Response instead of httpcore.Response: "
+            "use .status_code instead of .status and "
+            ".iter_bytes()/.aiter_bytes() instead of iterating .stream",
+            DeprecationWarning,
+            stacklevel=2,
         )
-
-        # 创建异步连接池
-        self.async_pool = httpcore.AsyncConnectionPool(
+        self._client = HTTPXClient(
+            base_url=base_url,
+            timeout=timeout,
             max_connections=max_connections,
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
             http2=http2,
-            ssl_context=(
-                None if ssl_verify else httpcore._ssl.create_untrusted_context()
-            ),
+            ssl_verify=ssl_verify,
+            default_headers=headers,
+            dns_cache_ttl=dns_cache_ttl,
         )
+        self.base_url = self._client.base_url
+        self.timeout = timeout
+        self.http2 = self._client.http2
+        self.ssl_verify = ssl_verify
+        self.default_headers = self._client.default_headers
 
     def close(self) -> None:
         """关闭同步连接池"""
-        self.sync_pool.close()
+        self._client.close()
 
     async def aclose(self) -> None:
         """关闭异步连接池"""
-        await self.async_pool.aclose()
+        await self._client.aclose()
 
     @contextlib.contextmanager
     def stream_context(
@@ -78,7 +156,7 @@ class HTTPXCoreTool:
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[Union[bytes, Iterable[bytes]]] = None,
-    ) -> Iterable[httpcore.Response]:
+    ) -> Iterator[httpx.Response]:
         """
         同步流式请求上下文管理器
 
@@ -87,23 +165,10 @@ class HTTPXCoreTool:
             for chunk in response.iter_bytes():
                 print(chunk)
         """
-        full_url = self._build_url(url, params)
-        req_headers = self._build_headers(headers)
-
-        response = self.sync_pool.request(
-            method=method.encode(),
-            url=self._parse_url(full_url),
-            headers=req_headers,
-            content=content,
-            timeout=self.timeout,
-        )
-
-        try:
+        with self._client.sync_client.stream(
+            method, url, params=params, headers=headers, content=content
+        ) as response:
             yield response
-        finally:
-            # 确保流关闭
-            for _ in response.stream:
-                pass
 
     @contextlib.asynccontextmanager
     async def async_stream_context(
@@ -113,32 +178,20 @@ class HTTPXCoreTool:
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[Union[bytes, Iterable[bytes]]] = None,
-    ) -> Iterable[httpcore.Response]:
+    ) -> AsyncIterator[httpx.Response]:
         """
         异步流式请求上下文管理器
 
         使用示例:
         async with tool.async_stream_context("GET", "https://example.com") as response:
-            async for chunk in response.astream_bytes():
+            async for chunk in response.aiter_bytes():
                 print(chunk)
         """
-        full_url = self._build_url(url, params)
-        req_headers = self._build_headers(headers)
-
-        response = await self.async_pool.request(
-            method=method.encode(),
-            url=self._parse_url(full_url),
-            headers=req_headers,
-            content=content,
-            timeout=self.timeout,
-        )
-
-        try:
-            yield response
-        finally:
-            # 确保流关闭
-            async for _ in response.stream:
-                pass
+        async with self._client._host_semaphore(url):
+            async with self._client.async_client.stream(
+                method, url, params=params, headers=headers, content=content
+            ) as response:
+                yield response
 
     def request(
         self,
@@ -148,20 +201,13 @@ class HTTPXCoreTool:
         headers: Optional[Dict[str, str]] = None,
         json_data: Optional[Any] = None,
         data: Optional[Union[bytes, Dict[str, Any]]] = None,
-    ) -> httpcore.Response:
+    ) -> httpx.Response:
         """
         同步 HTTP 请求
         """
         content, headers = self._prepare_content(json_data, data, headers)
-        full_url = self._build_url(url, params)
-        req_headers = self._build_headers(headers)
-
-        return self.sync_pool.request(
-            method=method.encode(),
-            url=self._parse_url(full_url),
-            headers=req_headers,
-            content=content,
-            timeout=self.timeout,
+        return self._client.sync_client.request(
+            method, url, params=params, headers=headers, content=content
         )
 
     async def async_request(
@@ -172,126 +218,70 @@ class HTTPXCoreTool:
         headers: Optional[Dict[str, str]] = None,
         json_data: Optional[Any] = None,
         data: Optional[Union[bytes, Dict[str, Any]]] = None,
-    ) -> httpcore.Response:
+    ) -> httpx.Response:
         """
         异步 HTTP 请求
         """
         content, headers = self._prepare_content(json_data, data, headers)
-        full_url = self._build_url(url, params)
-        req_headers = self._build_headers(headers)
-
-        return await self.async_pool.request(
-            method=method.encode(),
-            url=self._parse_url(full_url),
-            headers=req_headers,
-            content=content,
-            timeout=self.timeout,
-        )
-
-    # 快捷方法
-    def get(self, url: str, **kwargs) -> httpcore.Response:
-        return self.request("GET", url, **kwargs)
-
-    async def async_get(self, url: str, **kwargs) -> httpcore.Response:
-        return await self.async_request("GET", url, **kwargs)
-
-    def post(self, url: str, **kwargs) -> httpcore.Response:
-        return self.request("POST", url, **kwargs)
-
-    async def async_post(self, url: str, **kwargs) -> httpcore.Response:
-        return await self.async_request("POST", url, **kwargs)
-
-    def put(self, url: str, **kwargs) -> httpcore.Response:
-        return self.request("PUT", url, **kwargs)
-
-    async def async_put(self, url: str, **kwargs) -> httpcore.Response:
-        return await self.async_request("PUT", url, **kwargs)
-
-    def delete(self, url: str, **kwargs) -> httpcore.Response:
-        return self.request("DELETE", url, **kwargs)
-
-    async def async_delete(self, url: str, **kwargs) -> httpcore.Response:
-        return await self.async_request("DELETE", url, **kwargs)
+        async with self._client._host_semaphore(url):
+            return await self._client.async_client.request(
+                method, url, params=params, headers=headers, content=content
+            )
+
+    # 快捷方法：直接绑定 method 参数，省去一层转发调用
+    get = functools.partialmethod(request, "GET")
+    async_get = functools.partialmethod(async_request, "GET")
+    post = functools.partialmethod(request, "POST")
+    async_post = functools.partialmethod(async_request, "POST")
+    put = functools.partialmethod(request, "PUT")
+    async_put = functools.partialmethod(async_request, "PUT")
+    delete = functools.partialmethod(request, "DELETE")
+    async_delete = functools.partialmethod(async_request, "DELETE")
 
     # 辅助方法
-    def _build_url(self, url: str, params: Optional[Dict[str, Any]]) -> str:
-        """构建完整 URL"""
-        if not url.startswith(("http://", "https://")):
-            url = f"{self.base_url}/{url.lstrip('/')}"
-
-        if params:
-            from urllib.parse import urlencode
-
-            query = urlencode(params, doseq=True)
-            url = f"{url}?{query}" if "?" not in url else f"{url}&{query}"
-
-        return url
-
-    def _parse_url(self, url: str) -> Tuple[bytes, bytes, int, bytes]:
-        """解析 URL 为 httpcore 格式"""
-        from urllib.parse import urlparse
-
-        parsed = urlparse(url)
-        scheme = parsed.scheme.encode()
-        host = parsed.hostname.encode()
-        port = parsed.port or (443 if scheme == b"https" else 80)
-        path = parsed.path.encode() or b"/"
-        if parsed.query:
-            path += b"?" + parsed.query.encode()
-        return (scheme, host, port, path)
-
-    def _build_headers(
-        self, headers: Optional[Dict[str, str]]
-    ) -> List[Tuple[bytes, bytes]]:
-        """构建请求头列表"""
-        merged_headers = {**self.default_headers, **(headers or {})}
-        return [(k.lower().encode(), v.encode()) for k, v in merged_headers.items()]
-
     def _prepare_content(
         self,
         json_data: Optional[Any],
         data: Optional[Union[bytes, Dict[str, Any]]],
         headers: Optional[Dict[str, str]],
-    ) -> Tuple[Optional[Union[bytes, Iterable[bytes]]], Dict[str, str]]:
+    ) -> Tuple[Optional[bytes], Dict[str, str]]:
         """准备请求内容和头信息"""
         content = None
         headers = headers or {}
 
         if json_data is not None:
-            content = json.dumps(json_data).encode("utf-8")
+            content = _json_dumps(json_data)
             headers.setdefault("Content-Type", "application/json")
 
         elif data is not None:
             if isinstance(data, dict):
-                from urllib.parse import urlencode
-
-                content = urlencode(data, doseq=True).encode("utf-8")
-                headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+                if data:
+                    content = urlencode(data, doseq=True).encode("ascii")
+                    headers.setdefault(
+                        "Content-Type", "application/x-www-form-urlencoded"
+                    )
             else:
                 content = data
 
         return content, headers
 
     @staticmethod
-    def read_response(response: httpcore.Response) -> bytes:
+    def read_response(response: httpx.Response) -> bytes:
         """读取完整响应内容"""
-        return b"".join(response.stream)
+        return response.read()
 
     @staticmethod
-    def read_response_json(response: httpcore.Response) -> Any:
+    def read_response_json(response: httpx.Response) -> Any:
         """读取并解析 JSON 响应"""
-        return json.loads(HTTPXCoreTool.read_response(response))
+        return _json_loads(HTTPXCoreTool.read_response(response))
 
     @staticmethod
-    async def async_read_response(response: httpcore.Response) -> bytes:
+    async def async_read_response(response: httpx.Response) -> bytes:
         """异步读取完整响应内容"""
-        content = b""
-        async for chunk in response.stream:
-            content += chunk
-        return content
+        return await response.aread()
 
     @staticmethod
-    async def async_read_response_json(response: httpcore.Response) -> Any:
+    async def async_read_response_json(response: httpx.Response) -> Any:
         """异步读取并解析 JSON 响应"""
         content = await HTTPXCoreTool.async_read_response(response)
-        return json.loads(content)
+        return _json_loads(content)
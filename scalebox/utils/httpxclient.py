@@ -1,10 +1,272 @@
 import asyncio
+import atexit
 import contextlib
-import json
-from typing import Any, AsyncGenerator, Dict, Generator, Optional, Union
-
+import functools
+import ipaddress
+import logging
+import threading
+import urllib.request
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiohttp
 import httpx
 
+from .dns_cache import install_dns_cache
+
+try:
+    import h2  # noqa: F401  # httpx 的 HTTP/2 支持依赖 h2
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# aiohttp 3.10 起才区分连接超时与读取超时，旧版本统一按 asyncio.TimeoutError 处理
+_AIOHTTP_CONNECT_TIMEOUT = getattr(aiohttp, "ConnectionTimeoutError", ())
+_AIOHTTP_READ_TIMEOUT = getattr(aiohttp, "SocketTimeoutError", ())
+
+logger = logging.getLogger(__name__)
+
+
+def _environment_proxies() -> Dict[str, Optional[str]]:
+    """
+    按 httpx 的规则解析 HTTP(S)_PROXY/ALL_PROXY/NO_PROXY，返回 URL 模式到代理的映射
+
+    传入自定义 transport 时 httpx 不再读取环境变量中的代理，因此需要自行解析；
+    值为 None 的模式表示不走代理
+    """
+    proxy_info = urllib.request.getproxies()
+    mounts: Dict[str, Optional[str]] = {}
+    for scheme in ("http", "https", "all"):
+        url = proxy_info.get(scheme)
+        if url:
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+
+    for host in (h.strip() for h in proxy_info.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+            continue
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+        if address is not None and address.version == 6:
+            mounts[f"all://[{host}]"] = None
+        elif address is not None or host.lower() == "localhost":
+            mounts[f"all://{host}"] = None
+        else:
+            mounts[f"all://*{host}"] = None
+    return mounts
+
+
+class _AiohttpResponseStream(httpx.AsyncByteStream):
+    """把 aiohttp 响应体包装为 httpx 的异步字节流"""
+
+    def __init__(self, response: aiohttp.ClientResponse):
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._response.content.iter_chunked(64 * 1024):
+                yield chunk
+        except asyncio.TimeoutError as e:
+            raise httpx.ReadTimeout(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise httpx.ReadError(str(e)) from e
+
+    async def aclose(self) -> None:
+        self._response.release()
+
+
+class _WriteTimeoutBody:
+    """
+    为 aiohttp 补上写超时
+
+    aiohttp 取下一块之前会等上一块写完，所以一块交出后迟迟不来取下一块，
+    就说明写入卡住了；watch() 发现等待超过 write 超时后取消发送请求的任务
+    """
+
+    def __init__(self, stream: AsyncIterable[bytes], timeout: float):
+        self._stream = stream
+        self._timeout = timeout
+        self._writing_since: Optional[float] = None
+        self.timed_out = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        async for chunk in self._stream:
+            self._writing_since = loop.time()
+            yield chunk
+            self._writing_since = None
+
+    async def watch(self, task: "asyncio.Task[Any]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self._timeout / 4)
+            since = self._writing_since
+            if since is not None and loop.time() - since > self._timeout:
+                self.timed_out = True
+                task.cancel()
+                return
+
+
+async def _aiter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+def _sum_timeouts(*timeouts: Optional[float]) -> Optional[float]:
+    # 任一阶段不限时则整体不限时
+    if any(t is None for t in timeouts):
+        return None
+    return sum(timeouts)
+
+
+class _AiohttpTransport(httpx.AsyncBaseTransport):
+    """
+    基于 aiohttp 的 httpx 异步传输层
+
+    请求仍通过 httpx.AsyncClient 发出，调用方拿到的依然是 httpx.Response；
+    高并发下由 aiohttp 的连接器负责连接复用和 DNS 缓存
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits,
+        verify: bool = True,
+        dns_cache_ttl: Optional[float] = None,
+        proxy: Optional[httpx.Proxy] = None,
+    ):
+        self._limits = limits
+        self._verify = verify
+        self._dns_cache_ttl = dns_cache_ttl
+        self._proxy_url = str(proxy.url) if proxy else None
+        self._proxy_auth = (
+            aiohttp.BasicAuth(*proxy.auth) if proxy and proxy.auth else None
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # ClientSession 需要在事件循环内创建，因此延迟到第一次请求
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limits.max_connections or 0,
+                limit_per_host=self._limits.max_keepalive_connections or 0,
+                keepalive_timeout=self._limits.keepalive_expiry,
+                use_dns_cache=self._dns_cache_ttl is not None,
+                ttl_dns_cache=self._dns_cache_ttl,
+                ssl=None if self._verify else False,
+            )
+            # 解压与重定向交给 httpx 处理
+            self._session = aiohttp.ClientSession(
+                connector=connector, auto_decompress=False
+            )
+        return self._session
+
+    def connection_counts(self) -> Tuple[int, int]:
+        """
+        返回 (总连接数, 空闲连接数)
+
+        aiohttp 没有公开连接池统计，这里读取 TCPConnector 的私有属性；
+        属性不存在 (aiohttp 版本变化) 时按 0 计
+        """
+        if self._session is None or self._session.closed:
+            return 0, 0
+        connector = self._session.connector
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        return len(getattr(connector, "_acquired", ())) + idle, idle
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions.get("timeout", {})
+        # 分块上传由 aiohttp 重新决定，其余请求头原样传递
+        headers = [
+            (k, v)
+            for k, v in request.headers.multi_items()
+            if k.lower() != "transfer-encoding"
+        ]
+        if isinstance(request.stream, httpx.ByteStream):
+            # 内存中的请求体在构造 Request 时已读入
+            data = request.content or None
+        else:
+            # 流式请求体直接交给 aiohttp，边读边发
+            data = request.stream
+
+        body = watchdog = None
+        if data is not None and timeout.get("write") is not None:
+            if isinstance(data, bytes):
+                data = _aiter_bytes(data)
+            data = body = _WriteTimeoutBody(data, timeout["write"])
+            watchdog = asyncio.create_task(body.watch(asyncio.current_task()))
+        try:
+            response = await self._get_session().request(
+                request.method,
+                str(request.url),
+                headers=headers,
+                data=data,
+                allow_redirects=False,
+                proxy=self._proxy_url,
+                proxy_auth=self._proxy_auth,
+                skip_auto_headers=("Accept-Encoding", "User-Agent"),
+                timeout=aiohttp.ClientTimeout(
+                    # aiohttp 的 connect 包含等待连接池与建立连接
+                    connect=_sum_timeouts(timeout.get("pool"), timeout.get("connect")),
+                    sock_connect=timeout.get("connect"),
+                    sock_read=timeout.get("read"),
+                ),
+            )
+        except asyncio.CancelledError:
+            if body is None or not body.timed_out:
+                raise
+            task = asyncio.current_task()
+            if hasattr(task, "uncancel"):  # Python 3.11+
+                task.uncancel()
+            raise httpx.WriteTimeout(
+                "Timed out writing request body", request=request
+            ) from None
+        except _AIOHTTP_CONNECT_TIMEOUT as e:
+            raise httpx.ConnectTimeout(str(e), request=request) from e
+        except _AIOHTTP_READ_TIMEOUT as e:
+            raise httpx.ReadTimeout(str(e), request=request) from e
+        except asyncio.TimeoutError as e:
+            raise httpx.TimeoutException(str(e), request=request) from e
+        except aiohttp.ClientConnectionError as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+        except aiohttp.ClientError as e:
+            raise httpx.TransportError(str(e), request=request) from e
+        finally:
+            # 响应头到达后不再监视，剩余请求体由 aiohttp 自行发送
+            if watchdog is not None:
+                watchdog.cancel()
+
+        return httpx.Response(
+            status_code=response.status,
+            headers=[(k, v) for k, v in response.raw_headers],
+            stream=_AiohttpResponseStream(response),
+            extensions={"http_version": b"HTTP/1.1"},
+        )
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
 
 class HTTPXClient:
     """
@@ -12,85 +274,173 @@ class HTTPXClient:
     支持同步/异步请求、连接池管理、流式传输等完整功能
     """
 
+    __slots__ = (
+        "base_url",
+        "timeout",
+        "http2",
+        "ssl_verify",
+        "default_headers",
+        "follow_redirects",
+        "retries",
+        "backoff_factor",
+        "transport_backend",
+        "dns_cache_ttl",
+        "_limits",
+        "_closing_tasks",
+        "_host_limit",
+        "_host_sems",
+        "_host_sems_loop",
+        "sync_client",
+        "async_client",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         base_url: str = "",
         timeout: float = 30.0,
         max_connections: int = 100,
-        max_keepalive_connections: int = 50,
-        keepalive_expiry: float = 5.0,
-        http2: bool = False,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 60.0,
+        http2: Optional[bool] = None,
         ssl_verify: bool = True,
         default_headers: Optional[Dict[str, str]] = None,
         follow_redirects: bool = True,
         retries: int = 0,
         backoff_factor: float = 0.1,
+        transport_backend: Literal["httpx", "aiohttp"] = "httpx",
+        dns_cache_ttl: Optional[float] = None,
     ):
         """
         初始化 HTTP 客户端
 
+        默认请求头在创建 httpx 客户端时设置一次，由 httpx 与每次请求的 headers 合并
+
         :param base_url: 基础 URL 前缀
         :param timeout: 请求超时时间(秒)
         :param max_connections: 最大连接数
-        :param max_keepalive_connections: 最大空闲连接数
+        :param max_keepalive_connections: 最大空闲连接数，默认等于 max_connections
         :param keepalive_expiry: 空闲连接超时时间(秒)
-        :param http2: 是否启用 HTTP/2
+        :param http2: 是否启用 HTTP/2，默认在安装了 h2 时启用
         :param ssl_verify: 是否验证 SSL 证书
         :param default_headers: 默认请求头
         :param follow_redirects: 是否跟随重定向
-        :param retries: 请求失败重试次数
-        :param backoff_factor: 重试退避因子
+        :param retries: 连接失败时的重试次数
+        :param backoff_factor: 重试退避因子（httpx 传输层使用内置的指数退避，此值仅作记录）
+        :param transport_backend: 异步请求的传输层，"aiohttp" 适合高并发场景
+            （仅影响异步请求；aiohttp 传输层只支持 HTTP/1.1 且不重试，
+            与 http2=True 或 retries>0 同时使用会抛出 ValueError，
+            http2 为默认值 None 时异步请求使用 HTTP/1.1）
+        :param dns_cache_ttl: DNS 解析结果缓存时间(秒)，默认 None 不缓存；
+            可设为 dns_cache.DEFAULT_DNS_TTL 等值开启
+        :raises ValueError: aiohttp 传输层与 http2=True 或 retries>0 同时使用
         """
+        if transport_backend == "aiohttp" and (http2 or retries > 0):
+            raise ValueError(
+                "transport_backend='aiohttp' does not support http2=True or "
+                "retries>0; use the default 'httpx' backend for these options"
+            )
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.http2 = http2
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
         self.ssl_verify = ssl_verify
         self.default_headers = default_headers or {}
         self.follow_redirects = follow_redirects
         self.retries = retries
         self.backoff_factor = backoff_factor
+        self.transport_backend = transport_backend
+        self.dns_cache_ttl = dns_cache_ttl
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=(
+                max_connections
+                if max_keepalive_connections is None
+                else max_keepalive_connections
+            ),
+            keepalive_expiry=keepalive_expiry,
+        )
 
-        # 创建同步客户端
-        self.sync_client = httpx.Client(
+        # 异步请求按主机限制并发，单个慢主机不会占满整个连接池
+        self._host_limit = self._limits.max_keepalive_connections
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_sems_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 被替换下来、等待在事件循环中关闭的异步客户端
+        self._closing_tasks = set()
+        self.sync_client, self.async_client = self._build_clients()
+
+    def _build_clients(
+        self, proxy: Optional[httpx.Proxy] = None
+    ) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        """
+        按当前配置创建同步/异步客户端
+
+        重试由传输层完成；传入自定义传输时 httpx 不再使用客户端的
+        limits/http2/verify/proxy，也不再读取环境变量中的代理，
+        因此这些参数需要直接交给传输层，环境变量代理通过 mounts 挂载
+        """
+        # 显式设置的代理优先于环境变量
+        env_proxies = _environment_proxies() if proxy is None else {}
+        sync_client = httpx.Client(
             base_url=self.base_url,
             timeout=self.timeout,
-            limits=httpx.Limits(
-                max_connections=max_connections,
-                max_keepalive_connections=max_keepalive_connections,
-                keepalive_expiry=keepalive_expiry,
-            ),
-            http2=http2,
-            verify=ssl_verify,
             headers=self.default_headers,
-            follow_redirects=follow_redirects,
+            follow_redirects=self.follow_redirects,
+            transport=self._new_sync_transport(proxy),
+            mounts={
+                pattern: self._new_sync_transport(httpx.Proxy(url)) if url else None
+                for pattern, url in env_proxies.items()
+            },
         )
-
-        # 创建异步客户端
-        self.async_client = httpx.AsyncClient(
+        async_client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=self.timeout,
-            limits=httpx.Limits(
-                max_connections=max_connections,
-                max_keepalive_connections=max_keepalive_connections,
-                keepalive_expiry=keepalive_expiry,
-            ),
-            http2=http2,
-            verify=ssl_verify,
             headers=self.default_headers,
-            follow_redirects=follow_redirects,
+            follow_redirects=self.follow_redirects,
+            transport=self._new_async_transport(proxy),
+            mounts={
+                pattern: self._new_async_transport(httpx.Proxy(url)) if url else None
+                for pattern, url in env_proxies.items()
+            },
         )
+        return sync_client, async_client
 
-        # 配置重试
-        if retries > 0:
-            retry_transport = httpx.HTTPTransport(
-                retries=self.retries, backoff_factor=self.backoff_factor
-            )
-            async_retry_transport = httpx.AsyncHTTPTransport(
-                retries=self.retries, backoff_factor=self.backoff_factor
+    def _new_sync_transport(
+        self, proxy: Optional[httpx.Proxy] = None
+    ) -> httpx.BaseTransport:
+        """创建同步传输层"""
+        transport = httpx.HTTPTransport(
+            verify=self.ssl_verify,
+            http2=self.http2,
+            limits=self._limits,
+            retries=self.retries,
+            proxy=proxy,
+        )
+        if self.dns_cache_ttl is not None:
+            install_dns_cache(transport._pool, self.dns_cache_ttl)
+        return transport
+
+    def _new_async_transport(
+        self, proxy: Optional[httpx.Proxy] = None
+    ) -> httpx.AsyncBaseTransport:
+        """按 transport_backend 创建异步传输层"""
+        if self.transport_backend == "aiohttp":
+            return _AiohttpTransport(
+                self._limits,
+                verify=self.ssl_verify,
+                dns_cache_ttl=self.dns_cache_ttl,
+                proxy=proxy,
             )
-
-            self.sync_client = httpx.Client(transport=retry_transport)
-            self.async_client = httpx.AsyncClient(transport=async_retry_transport)
+        transport = httpx.AsyncHTTPTransport(
+            verify=self.ssl_verify,
+            http2=self.http2,
+            limits=self._limits,
+            retries=self.retries,
+            proxy=proxy,
+        )
+        if self.dns_cache_ttl is not None:
+            install_dns_cache(transport._pool, self.dns_cache_ttl)
+        return transport
 
     def close(self) -> None:
         """关闭同步客户端"""
@@ -100,6 +450,39 @@ class HTTPXClient:
         """关闭异步客户端"""
         await self.async_client.aclose()
 
+    def __del__(self) -> None:
+        # 兜底：未显式关闭时释放同步连接池
+        try:
+            self.sync_client.close()
+        except Exception:
+            pass
+
+    def _replace_clients(self, proxy: Optional[httpx.Proxy] = None) -> None:
+        """关闭旧的同步客户端并替换为新客户端，旧的异步客户端交给 _close_later"""
+        old_async_client = self.async_client
+        self.sync_client.close()
+        self.sync_client, self.async_client = self._build_clients(proxy)
+        self._close_later(old_async_client)
+
+    def _close_later(self, client: httpx.AsyncClient) -> None:
+        """
+        在同步方法中关闭异步客户端：有运行中的事件循环时异步关闭，否则尽力关闭
+
+        没有运行中的事件循环时，旧客户端的连接可能属于一个已关闭的事件循环
+        (例如之前在 asyncio.run 中使用过)，此时关闭失败只记录日志，直接丢弃引用
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                asyncio.run(client.aclose())
+            except Exception as exc:
+                logger.debug("丢弃无法关闭的异步客户端: %r", exc)
+            return
+        task = loop.create_task(client.aclose())
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
     @contextlib.contextmanager
     def context(self) -> "HTTPXClient":
         """
@@ -146,12 +529,11 @@ class HTTPXClient:
             for chunk in response.iter_bytes():
                 process_chunk(chunk)
         """
-        headers = headers or {}
         with self.sync_client.stream(
             method,
             url,
             params=params,
-            headers={**self.default_headers, **headers},
+            headers=headers,
             json=json_data,
             data=data,
         ) as response:
@@ -174,17 +556,19 @@ class HTTPXClient:
         async with client.astream("GET", "/large-file") as response:
             async for chunk in response.aiter_bytes():
                 process_chunk(chunk)
+
+        流式响应在读取期间一直占用连接，因此整个上下文都持有主机信号量
         """
-        headers = headers or {}
-        async with self.async_client.stream(
-            method,
-            url,
-            params=params,
-            headers={**self.default_headers, **headers},
-            json=json_data,
-            data=data,
-        ) as response:
-            yield response
+        async with self._host_semaphore(url):
+            async with self.async_client.stream(
+                method,
+                url,
+                params=params,
+                headers=headers,
+                json=json_data,
+                data=data,
+            ) as response:
+                yield response
 
     # ================ 同步请求方法 ================
     def request(
@@ -197,24 +581,19 @@ class HTTPXClient:
         data: Optional[Union[bytes, Dict[str, Any]]] = None,
     ) -> httpx.Response:
         """同步 HTTP 请求"""
-        headers = headers or {}
         return self.sync_client.request(
             method,
             url,
             params=params,
-            headers={**self.default_headers, **headers},
+            headers=headers,
             json=json_data,
             data=data,
         )
 
-    def get(
-        self,
-        url: str,
-        params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None,
-    ) -> httpx.Response:
-        """同步 GET 请求"""
-        return self.request("GET", url, params=params, headers=headers)
+    # GET/DELETE 的参数顺序与 request 一致，直接绑定 method；
+    # POST/PUT 的第二个位置参数是 json_data，保留为普通方法
+    get = functools.partialmethod(request, "GET")
+    delete = functools.partialmethod(request, "DELETE")
 
     def post(
         self,
@@ -242,15 +621,6 @@ class HTTPXClient:
             "PUT", url, params=params, headers=headers, json_data=json_data, data=data
         )
 
-    def delete(
-        self,
-        url: str,
-        params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None,
-    ) -> httpx.Response:
-        """同步 DELETE 请求"""
-        return self.request("DELETE", url, params=params, headers=headers)
-
     # ================ 异步请求方法 ================
     async def arequest(
         self,
@@ -262,24 +632,36 @@ class HTTPXClient:
         data: Optional[Union[bytes, Dict[str, Any]]] = None,
     ) -> httpx.Response:
         """异步 HTTP 请求"""
-        headers = headers or {}
-        return await self.async_client.request(
-            method,
-            url,
-            params=params,
-            headers={**self.default_headers, **headers},
-            json=json_data,
-            data=data,
-        )
+        async with self._host_semaphore(url):
+            return await self.async_client.request(
+                method,
+                url,
+                params=params,
+                headers=headers,
+                json=json_data,
+                data=data,
+            )
 
-    async def aget(
-        self,
-        url: str,
-        params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None,
-    ) -> httpx.Response:
-        """异步 GET 请求"""
-        return await self.arequest("GET", url, params=params, headers=headers)
+    def _host_semaphore(
+        self, url: str
+    ) -> Union[asyncio.Semaphore, AsyncContextManager]:
+        """获取 URL 所属主机的信号量，上限为 max_keepalive_connections"""
+        if not self._host_limit:
+            return contextlib.nullcontext()
+        # 信号量绑定事件循环，换了事件循环 (如多次 asyncio.run) 时重新创建
+        loop = asyncio.get_running_loop()
+        if self._host_sems_loop is not loop:
+            self._host_sems = {}
+            self._host_sems_loop = loop
+        # 相对路径使用 base_url 的主机
+        host = httpx.URL(url).host or self.async_client.base_url.host
+        semaphore = self._host_sems.get(host)
+        if semaphore is None:
+            semaphore = self._host_sems[host] = asyncio.Semaphore(self._host_limit)
+        return semaphore
+
+    aget = functools.partialmethod(arequest, "GET")
+    adelete = functools.partialmethod(arequest, "DELETE")
 
     async def apost(
         self,
@@ -307,14 +689,71 @@ class HTTPXClient:
             "PUT", url, params=params, headers=headers, json_data=json_data, data=data
         )
 
-    async def adelete(
+    # ================ 连接预热 ================
+    def warmup(self, url: str = "/") -> None:
+        """
+        预先建立连接 (同步)
+
+        发送一次 HEAD 请求完成 TCP/TLS 握手（HTTP/2 下同时完成 SETTINGS 交换），
+        之后的请求直接复用该连接；响应状态码不影响预热效果
+        """
+        self.sync_client.head(url)
+
+    async def awarmup(self, url: str = "/") -> None:
+        """预先建立连接 (异步)，说明同 warmup"""
+        await self.async_client.head(url)
+
+    # ================ 并发批量请求 ================
+    async def abatch(
+        self,
+        requests: Iterable[Tuple[str, str, Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+    ) -> List[Union[httpx.Response, BaseException]]:
+        """
+        并发发送一批异步请求，同时在途的请求数由信号量限制
+
+        concurrency 默认等于连接池的 max_connections；设为 max_keepalive_connections
+        时连接复用率最高。单个请求失败不会中断其他请求，异常按位置返回。
+
+        使用示例:
+        responses = await client.abatch(
+            [("GET", "/a", {}), ("POST", "/b", {"json_data": {}})]
+        )
+
+        :param requests: (method, url, kwargs) 三元组，kwargs 传给 arequest
+        :param concurrency: 最大并发请求数
+        :return: 与 requests 顺序一致的响应或异常列表
+        """
+        semaphore = asyncio.Semaphore(
+            concurrency or self._limits.max_connections or 100
+        )
+
+        async def _one(method: str, url: str, kwargs: Dict[str, Any]):
+            async with semaphore:
+                return await self.arequest(method, url, **kwargs)
+
+        return await asyncio.gather(
+            *(_one(method, url, kwargs) for method, url, kwargs in requests),
+            return_exceptions=True,
+        )
+
+    async def amap(
         self,
-        url: str,
-        params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None,
-    ) -> httpx.Response:
-        """异步 DELETE 请求"""
-        return await self.arequest("DELETE", url, params=params, headers=headers)
+        method: str,
+        urls: Iterable[str],
+        *,
+        concurrency: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Union[httpx.Response, BaseException]]:
+        """
+        对一组 URL 并发发送同一种请求，参数含义同 abatch
+
+        使用示例:
+        responses = await client.amap("GET", ["/a", "/b"], concurrency=10)
+        """
+        return await self.abatch(
+            ((method, url, kwargs) for url in urls), concurrency=concurrency
+        )
 
     # ================ 响应处理工具 ================
     @staticmethod
@@ -348,31 +787,53 @@ class HTTPXClient:
         return await response.ajson()
 
     # ================ 连接池状态 ================
-    def connection_pool_status(self) -> Dict[str, Any]:
-        """获取同步连接池状态"""
-        transport = self.sync_client._transport
+    def _pool_status(
+        self, transport: Union[httpx.BaseTransport, httpx.AsyncBaseTransport]
+    ) -> Dict[str, Any]:
+        """统计默认传输层的连接数 (不含环境变量代理挂载的传输层)"""
+        if isinstance(transport, _AiohttpTransport):
+            total, idle = transport.connection_counts()
+        else:
+            connections = transport._pool.connections
+            total = len(connections)
+            idle = sum(1 for connection in connections if connection.is_idle())
         return {
-            "total_connections": transport._pool.num_connections,
-            "active_connections": transport._pool.num_active_connections,
-            "idle_connections": transport._pool.num_idle_connections,
-            "max_connections": transport._pool.max_connections,
+            "total_connections": total,
+            "active_connections": total - idle,
+            "idle_connections": idle,
+            "max_connections": self._limits.max_connections,
         }
 
+    def connection_pool_status(self) -> Dict[str, Any]:
+        """获取同步连接池状态"""
+        return self._pool_status(self.sync_client._transport)
+
     async def aconnection_pool_status(self) -> Dict[str, Any]:
         """获取异步连接池状态"""
-        transport = self.async_client._transport
-        return {
-            "total_connections": transport._pool.num_connections,
-            "active_connections": transport._pool.num_active_connections,
-            "idle_connections": transport._pool.num_idle_connections,
-            "max_connections": transport._pool.max_connections,
-        }
+        return self._pool_status(self.async_client._transport)
 
     # ================ 高级功能 ================
     def set_proxy(self, proxy_url: str, proxy_auth: Optional[tuple] = None) -> None:
-        """设置代理 (同步和异步)"""
-        self.sync_client = httpx.Client(proxies=proxy_url, auth=proxy_auth)
-        self.async_client = httpx.AsyncClient(proxies=proxy_url, auth=proxy_auth)
+        """
+        设置代理 (同步和异步)
+
+        会关闭现有客户端并按当前配置重建；在事件循环中调用时建议使用 aset_proxy
+
+        :param proxy_url: 代理地址
+        :param proxy_auth: 代理认证 (用户名, 密码)
+        """
+        self._replace_clients(httpx.Proxy(proxy_url, auth=proxy_auth))
+
+    async def aset_proxy(
+        self, proxy_url: str, proxy_auth: Optional[tuple] = None
+    ) -> None:
+        """设置代理，并等待旧的异步客户端关闭完成"""
+        old_async_client = self.async_client
+        self.sync_client.close()
+        self.sync_client, self.async_client = self._build_clients(
+            httpx.Proxy(proxy_url, auth=proxy_auth)
+        )
+        await old_async_client.aclose()
 
     def set_cookies(self, cookies: Dict[str, str]) -> None:
         """设置 Cookies (同步和异步)"""
@@ -385,19 +846,81 @@ class HTTPXClient:
         self.async_client.event_hooks[event].append(hook)
 
     def reset_client(self) -> None:
-        """重置客户端 (清除所有状态)"""
-        self.close()
-        self.async_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=self.timeout,
-            http2=self.http2,
-            verify=self.ssl_verify,
-            headers=self.default_headers,
-        )
-        self.sync_client = httpx.Client(
-            base_url=self.base_url,
-            timeout=self.timeout,
-            http2=self.http2,
-            verify=self.ssl_verify,
-            headers=self.default_headers,
-        )
+        """重置客户端 (清除所有状态，包括代理、Cookies 与事件钩子)"""
+        self._replace_clients()
+
+
+# 进程内共享的客户端，按构造参数区分
+_default_clients: Dict[
+    Tuple[Hashable, Optional[asyncio.AbstractEventLoop]], HTTPXClient
+] = {}
+_default_lock = threading.Lock()
+
+
+def _freeze(value: Any) -> Hashable:
+    """把构造参数转换为可哈希的键 (如 default_headers 字典、httpx.Timeout)"""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, httpx.Timeout):
+        return httpx.Timeout, _freeze(value.as_dict())
+    hash(value)  # 其他不可哈希的参数在这里抛出 TypeError
+    return value
+
+
+def _close_default_client(client: HTTPXClient) -> None:
+    """关闭共享客户端的同步与异步两侧"""
+    client.close()
+    client._close_later(client.async_client)
+
+
+@atexit.register
+def _close_default_clients() -> None:
+    """进程退出时关闭所有共享客户端"""
+    with _default_lock:
+        clients = list(_default_clients.values())
+        _default_clients.clear()
+    for client in clients:
+        _close_default_client(client)
+
+
+def get_default_client(**kwargs) -> HTTPXClient:
+    """
+    获取按参数共享的 HTTPXClient，进程退出时自动关闭
+
+    相同参数的调用复用同一组连接池，避免每次请求重新建连与 TLS 握手。
+    异步客户端绑定事件循环，因此共享按调用时的事件循环区分：
+
+    - 同步代码 (无运行中的事件循环)：全进程共享一个客户端，
+      可在模块级调用：client = get_default_client(base_url="https://api.x")
+    - 异步代码：请在协程内调用，同一事件循环内共享，
+      事件循环关闭后对应的客户端会在下次调用时被清理
+
+    :param kwargs: 传给 HTTPXClient 的构造参数
+    :raises ValueError: 参数无法作为缓存键 (不可哈希)
+    """
+    frozen = {}
+    for name, value in kwargs.items():
+        try:
+            frozen[name] = _freeze(value)
+        except TypeError as e:
+            raise ValueError(
+                f"get_default_client() argument {name!r} cannot be used as a "
+                f"cache key: {e}"
+            ) from None
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    key = (frozenset(frozen.items()), loop)
+    with _default_lock:
+        stale = [k for k in _default_clients if k[1] is not None and k[1].is_closed()]
+        stale_clients = [_default_clients.pop(k) for k in stale]
+        client = _default_clients.get(key)
+        if client is None:
+            client = _default_clients[key] = HTTPXClient(**kwargs)
+    # 异步一侧的连接属于已关闭的事件循环，无法再关闭，只关闭同步一侧
+    for stale_client in stale_clients:
+        stale_client.close()
+    return client
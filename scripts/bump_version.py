@@ -11,13 +11,18 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+_PY_VER_RE = re.compile(r'^__version__\s*=\s*"([^"]+)"', re.MULTILINE)
+_PY_VER_INFO_RE = re.compile(r"^__version_info__\s*=\s*\([^)]+\)", re.MULTILINE)
+# Anchored so keys like mypy's python_version are left alone
+_TOML_VER_RE = re.compile(r'^version\s*=\s*"[^"]+"', re.MULTILINE)
+
 
 def get_current_version() -> str:
     """Get current version from __init__.py"""
     init_file = Path("scalebox/__init__.py")
     with open(init_file, "r") as f:
         content = f.read()
-    match = re.search(r'__version__ = "([^"]+)"', content)
+    match = _PY_VER_RE.search(content)
     if not match:
         raise ValueError("Could not find version in scalebox/__init__.py")
     return match.group(1)
@@ -49,38 +54,23 @@ def update_version_files(new_version: str):
         "scalebox/version.py",
         "pyproject.toml",
     ]
-    
-    for file_path in files_to_update:
-        if Path(file_path).exists():
-            with open(file_path, "r") as f:
-                content = f.read()
-            
-            # Update version in different file formats
-            if file_path.endswith(".py"):
-                # Update __version__
-                content = re.sub(
-                    r'__version__ = "[^"]+"', 
-                    f'__version__ = "{new_version}"', 
-                    content
-                )
-                # Update __version_info__ tuple
-                major, minor, patch = parse_version(new_version)
-                content = re.sub(
-                    r'__version_info__ = \([^)]+\)', 
-                    f'__version_info__ = ({major}, {minor}, {patch})', 
-                    content
-                )
-            elif file_path.endswith(".toml"):
-                content = re.sub(
-                    r'version = "[^"]+"', 
-                    f'version = "{new_version}"', 
-                    content
-                )
-            
-            with open(file_path, "w") as f:
-                f.write(content)
-            
-            print(f"Updated {file_path} to version {new_version}")
+    major, minor, patch = parse_version(new_version)
+
+    for fp in map(Path, files_to_update):
+        if not fp.exists():
+            continue
+
+        content = fp.read_text()
+        if fp.suffix == ".py":
+            content = _PY_VER_RE.sub(f'__version__ = "{new_version}"', content)
+            content = _PY_VER_INFO_RE.sub(
+                f"__version_info__ = ({major}, {minor}, {patch})", content
+            )
+        else:
+            content = _TOML_VER_RE.sub(f'version = "{new_version}"', content)
+        fp.write_text(content)
+
+        print(f"Updated {fp} to version {new_version}")
 
 
 def update_changelog(new_version: str, bump_type: str):
@@ -139,7 +129,9 @@ def create_git_tag(version: str):
         return
     
     # Create tag
-    subprocess.run(["git", "tag", "-a", tag_name, "-m", f"Release {version}"])
+    subprocess.run(
+        ["git", "tag", "-a", tag_name, "-m", f"Release {version}"], check=True
+    )
     print(f"Created git tag: {tag_name}")
 
 
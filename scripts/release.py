@@ -3,55 +3,101 @@
 Release script for ScaleBox Python SDK
 """
 
+import glob
 import os
 import re
+import shlex
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
 
-def run_command(cmd: str, check: bool = True) -> str:
-    """Run a shell command and return its output."""
-    print(f"Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+VERSION_FILES = ["pyproject.toml", "scalebox/__init__.py", "scalebox/version.py"]
+# Matched against single lines, so ^ anchors at the start of each line
+PYPROJECT_VERSION_RE = re.compile(rb'^(version\s*=\s*)"[^"]+"')
+DUNDER_VERSION_RE = re.compile(rb'^(__version__\s*=\s*)"[^"]+"')
+
+
+def run_command(cmd: list[str], check: bool = True, stream: bool = False) -> str:
+    """
+    Run a command without a shell and return its output.
+
+    With stream=True the command writes straight to the terminal and
+    nothing is captured, which suits long-running steps like tests.
+    """
+    print(f"Running: {shlex.join(cmd)}")
+    if stream:
+        result = subprocess.run(cmd)
+        if check and result.returncode != 0:
+            sys.exit(1)
+        return ""
+    result = subprocess.run(cmd, capture_output=True, text=True)
     if check and result.returncode != 0:
         print(f"Error: {result.stderr}")
         sys.exit(1)
     return result.stdout.strip()
 
 
-def get_current_version() -> str:
-    """Get the current version from pyproject.toml."""
-    with open("pyproject.toml", "r") as f:
-        content = f.read()
-    match = re.search(r'version = "([^"]+)"', content)
-    if not match:
-        raise ValueError("Could not find version in pyproject.toml")
-    return match.group(1)
-
-
-def update_version(new_version: str):
-    """Update version in pyproject.toml and __init__.py."""
-    # Update pyproject.toml
-    with open("pyproject.toml", "r") as f:
-        content = f.read()
-    content = re.sub(r'version = "[^"]+"', f'version = "{new_version}"', content)
-    with open("pyproject.toml", "w") as f:
-        f.write(content)
-    
-    # Update __init__.py
-    with open("scalebox/__init__.py", "r") as f:
-        content = f.read()
-    content = re.sub(r'__version__ = "[^"]+"', f'__version__ = "{new_version}"', content)
-    with open("scalebox/__init__.py", "w") as f:
-        f.write(content)
-    
-    # Update version.py
-    with open("scalebox/version.py", "r") as f:
-        content = f.read()
-    content = re.sub(r'__version__ = "[^"]+"', f'__version__ = "{new_version}"', content)
-    with open("scalebox/version.py", "w") as f:
-        f.write(content)
+def _pyproject_version(pyproject_bytes: bytes) -> str:
+    return tomllib.loads(pyproject_bytes.decode("utf-8"))["project"]["version"]
+
+
+def get_current_version() -> tuple[str, bytes]:
+    """
+    Get the current version from pyproject.toml.
+
+    The raw file content is returned as well so update_version can reuse it.
+    """
+    pyproject_bytes = Path("pyproject.toml").read_bytes()
+    return _pyproject_version(pyproject_bytes), pyproject_bytes
+
+
+def update_version(new_version: str, pyproject_bytes: bytes | None = None):
+    """Update version in pyproject.toml, __init__.py and version.py."""
+    replacement = rb'\1"' + new_version.encode() + b'"'
+    for path in map(Path, VERSION_FILES):
+        if path.name == "pyproject.toml" and pyproject_bytes is not None:
+            content = pyproject_bytes
+        else:
+            content = path.read_bytes()
+        lines = content.splitlines(keepends=True)
+        pattern = DUNDER_VERSION_RE if path.suffix == ".py" else PYPROJECT_VERSION_RE
+        # Only the first version line is rewritten
+        for i, line in enumerate(lines):
+            new_line, count = pattern.subn(replacement, line, count=1)
+            if count:
+                lines[i] = new_line
+                break
+        else:
+            raise ValueError(f"Could not find version in {path}")
+        content = b"".join(lines)
+        path.write_bytes(content)
+        if path.name == "pyproject.toml":
+            pyproject_bytes = content
+
+    # Make sure pyproject.toml still parses and carries the new version
+    written = _pyproject_version(pyproject_bytes)
+    if written != new_version:
+        raise ValueError(
+            f"pyproject.toml has version {written}, expected {new_version}"
+        )
+
+
+def get_current_branch() -> str:
+    """Get the checked-out branch, empty when HEAD is detached."""
+    head = Path(".git/HEAD")
+    # Worktrees and submodules have a .git file instead, ask git there
+    if not head.is_file():
+        return run_command(["git", "branch", "--show-current"])
+    ref = head.read_text().strip()
+    if not ref.startswith("ref: refs/heads/"):
+        return ""
+    return ref.removeprefix("ref: refs/heads/")
 
 
 def main():
@@ -62,13 +108,24 @@ def main():
         sys.exit(1)
     
     new_version = sys.argv[1]
-    current_version = get_current_version()
-    
+
+    # CI checkouts are clean, so git status is only run for local releases;
+    # locally it overlaps with the version lookup
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        status_future = None
+        if not os.environ.get("CI"):
+            status_future = executor.submit(
+                run_command, ["git", "status", "--porcelain"]
+            )
+        version_future = executor.submit(get_current_version)
+        branch = get_current_branch()
+        current_version, pyproject_bytes = version_future.result()
+        status = status_future.result() if status_future else ""
+
     print(f"Current version: {current_version}")
     print(f"New version: {new_version}")
     
     # Check if we're on main branch
-    branch = run_command("git branch --show-current")
     if branch != "main":
         print("Warning: Not on main branch")
         response = input("Continue anyway? (y/N): ")
@@ -76,7 +133,6 @@ def main():
             sys.exit(1)
     
     # Check for uncommitted changes
-    status = run_command("git status --porcelain")
     if status:
         print("Error: You have uncommitted changes")
         print(status)
@@ -84,25 +140,25 @@ def main():
     
     # Update version
     print("Updating version...")
-    update_version(new_version)
+    update_version(new_version, pyproject_bytes)
     
     # Run tests
     print("Running tests...")
-    run_command("python -m pytest scalebox/test -v")
+    run_command([sys.executable, "-m", "pytest", "scalebox/test", "-v"], stream=True)
     
     # Build package
     print("Building package...")
-    run_command("python -m build")
+    run_command([sys.executable, "-m", "build"], stream=True)
     
     # Check package
     print("Checking package...")
-    run_command("twine check dist/*")
+    run_command(["twine", "check", *sorted(glob.glob("dist/*"))], stream=True)
     
     # Commit changes
     print("Committing changes...")
-    run_command(f"git add pyproject.toml scalebox/__init__.py scalebox/version.py")
-    run_command(f'git commit -m "Release version {new_version}"')
-    run_command(f"git tag v{new_version}")
+    run_command(["git", "add", *VERSION_FILES])
+    run_command(["git", "commit", "-m", f"Release version {new_version}"])
+    run_command(["git", "tag", f"v{new_version}"])
     
     print(f"Release {new_version} is ready!")
     print("To publish to PyPI, run:")